@@ -0,0 +1,68 @@
+# Benchmark of writing the CSV data files
+#
+# Compares, on the same generated rows:
+# * csv.writer: writerows(sample_arr.tolist()), how the files were written before
+# * format_csv_rows: Formatting the whole matrix at once (serial_hunter_csv.py)
+# * CSVWriter: Formatting in chunks of --chunk_rows and writing (and
+#   compressing) from the background thread, for each compression
+# and checks that every one of them gives the same bytes
+#
+# python benchmarks/bench_csv_writer.py [--rows N] [--single_sample_size N] [--with_pos] [--chunk_rows N]
+
+import argparse
+import csv
+import gzip
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from serial_hunter_csv import COMPRESSION_GZIP, CSVWriter, format_csv_rows
+from serial_hunter_pool import generate_chunk, make_job, make_part
+
+def _print(name, rows, size, elapsed):
+  print("%-24s %8.3fs %12.0f rows/s %s" % (name, elapsed, rows/elapsed, "%8.1f MB/s" % (size/elapsed/1e6) if size else ""))
+
+def main(argv=None):
+  parser = argparse.ArgumentParser()
+  parser.add_argument("--rows", type=int, default=50000)
+  parser.add_argument("--single_sample_size", type=int, default=50)
+  parser.add_argument("--with_pos", action="store_true", default=False)
+  parser.add_argument("--chunk_rows", type=int, default=5000)
+  args = parser.parse_args(argv)
+
+  job = make_job('bench.csv', [make_part('sparse', 'sparse', args.rows)], args.single_sample_size, args.with_pos)
+  start = time.perf_counter()
+  sample_arr, pos_index_arr, _ = generate_chunk(job, 0, args.rows, seed=0)
+  _print("generate_chunk", args.rows, None, time.perf_counter() - start)
+  if args.with_pos:
+    sample_arr = np.hstack([pos_index_arr, sample_arr])
+
+  start = time.perf_counter()
+  text = io.StringIO()
+  csv.writer(text).writerows(sample_arr.tolist())
+  expected = text.getvalue().encode()
+  _print("csv.writer", args.rows, len(expected), time.perf_counter() - start)
+
+  start = time.perf_counter()
+  data = format_csv_rows(sample_arr)
+  _print("format_csv_rows", args.rows, len(data), time.perf_counter() - start)
+  assert data == expected, "format_csv_rows does not match csv.writer"
+
+  with tempfile.TemporaryDirectory() as directory:
+    for compression, filename, read in [(None, 'bench.csv', lambda f: open(f, mode='rb').read()), (COMPRESSION_GZIP, 'bench.csv.gz', lambda f: gzip.open(f).read())]:
+      filename = os.path.join(directory, filename)
+      start = time.perf_counter()
+      with CSVWriter(filename, compression) as writer:
+        for chunk_start in range(0, args.rows, args.chunk_rows):
+          writer.write_rows(sample_arr[chunk_start:chunk_start + args.chunk_rows])
+      _print("CSVWriter (%s)" % compression, args.rows, len(expected), time.perf_counter() - start)
+      assert read(filename) == expected, "%s does not match csv.writer" % filename
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,186 @@
+# Throughput benchmark of the generators, with regression tracking
+#
+# Measures, for every strategy:
+# * seq: generate_seq / generate_seq_batch
+# * non_seq: generate_non_seq_numbers / generate_non_seq_numbers_batch
+# * sparse: generate_seq_sparse / generate_seq_sparse_batch
+# * pct: generate_seq_head_within_pct_position (0 to 50%) and its batch version
+# in both the per-sample (scalar, serial_hunter_seq.py) and the vectorized
+# (batch, serial_hunter_batch.py) versions, across --single_sample_size and
+# --number_size, and the full file writing path (generate_chunk, format,
+# write, see serial_hunter_pool.py) for each --format at NUMBER_SIZE:
+# * rows/s, samples generated (or written) per second, best of --repeat timings
+# * bytes/s, 8 bytes per generated number, or the file bytes for the file path
+# * peak memory (tracemalloc, measured on its own run, as tracing slows the run down)
+#
+# --save writes the results to a JSON file, --baseline compares the run with
+# such a file, and exits with 1 if any case got more than --threshold slower
+# (rows/s) or used more than --threshold more peak memory. Baselines only mean
+# something on the machine they were made on, so none is kept in the repo
+#
+# python benchmarks/bench_generation.py [--quick] [--save results.json] [--baseline baseline.json --threshold 0.2]
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from serial_hunter_batch import generate_non_seq_numbers_batch, generate_seq_batch, generate_seq_head_within_pct_position_batch, generate_seq_sparse_batch
+from serial_hunter_config import BATCH_NUMBER_COUNT, NUMBER_SIZE, SINGLE_SAMPLE_SIZE_50, THRESHOLD_GAP, THRESHOLD_SEQUENCE
+from serial_hunter_pool import FORMAT_EXTENSIONS, FORMATS, job_filenames, make_job, make_part, run_jobs
+from serial_hunter_seq import generate_non_seq_numbers, generate_seq, generate_seq_head_within_pct_position, generate_seq_sparse
+
+STRATEGIES = ['seq', 'non_seq', 'sparse', 'pct']
+SINGLE_SAMPLE_SIZES = [10, SINGLE_SAMPLE_SIZE_50, BATCH_NUMBER_COUNT]
+NUMBER_SIZES = [10, NUMBER_SIZE, 18]
+# Numbers generated in each run of a case, split into rows of single_sample_size
+SCALAR_NUMBERS = 200000
+BATCH_NUMBERS = 5000000
+FILE_NUMBERS = 2500000
+THRESHOLD = 0.2
+# Each of the --repeat timings calls the case until this long has passed, so short cases are not just timer noise
+MIN_SECONDS = 0.2
+# Peak memory changes smaller than this are noise, e.g., in the scalar cases that use a few kB
+MEMORY_NOISE_BYTES = 1 << 20
+
+# Numbers generated for each row
+def _row_numbers(strategy, single_sample_size):
+  return {'seq': THRESHOLD_SEQUENCE, 'non_seq': single_sample_size - THRESHOLD_SEQUENCE}.get(strategy, single_sample_size)
+
+# Returns run(rows), generating rows samples of single_sample_size numbers of
+# number_size digits and returning the bytes generated
+def _case(implementation, strategy, single_sample_size, number_size):
+  min_number, max_number = 10**(number_size - 1), 10**number_size
+  if implementation == 'scalar':
+    # The per-sample functions take max_number as inclusive
+    rng = random.Random(0)
+    seq = lambda: generate_seq(THRESHOLD_SEQUENCE, min_number, max_number - 1, rng=rng)
+    functions = {
+      'seq': lambda: seq(),
+      'non_seq': lambda: generate_non_seq_numbers(seq(), min_number, max_number, THRESHOLD_GAP, single_sample_size, rng),
+      'sparse': lambda: generate_seq_sparse(seq(), min_number, max_number, THRESHOLD_GAP, single_sample_size, rng=rng),
+      'pct': lambda: generate_seq_head_within_pct_position(seq(), min_number, max_number, 0, 50, THRESHOLD_GAP, single_sample_size, rng=rng),
+    }
+    function = functions[strategy]
+    def run(rows):
+      for _ in range(rows):
+        function()
+      return rows*_row_numbers(strategy, single_sample_size)*8
+    return run
+  rng = np.random.default_rng(0)
+  seq_batch = lambda rows: generate_seq_batch(rows, THRESHOLD_SEQUENCE, min_number, max_number, rng=rng)
+  functions = {
+    'seq': lambda rows: seq_batch(rows),
+    'non_seq': lambda rows: generate_non_seq_numbers_batch(seq_batch(rows), min_number, max_number, THRESHOLD_GAP, single_sample_size, rng),
+    'sparse': lambda rows: generate_seq_sparse_batch(seq_batch(rows), min_number, max_number, THRESHOLD_GAP, single_sample_size, rng),
+    'pct': lambda rows: generate_seq_head_within_pct_position_batch(seq_batch(rows), min_number, max_number, 0, 50, THRESHOLD_GAP, single_sample_size, rng),
+  }
+  def run(rows):
+    functions[strategy](rows)
+    return rows*_row_numbers(strategy, single_sample_size)*8
+  return run
+
+# Returns run(rows), writing a file of rows samples and returning its bytes
+def _file_case(output_format, single_sample_size, directory):
+  filename = os.path.join(directory, 'bench' + FORMAT_EXTENSIONS[output_format])
+  def run(rows):
+    job = make_job(filename, [make_part('sparse', 'sparse', rows)], single_sample_size, with_pos=True, output_format=output_format)
+    with contextlib.redirect_stdout(io.StringIO()):
+      run_jobs([job], seed=0)
+    return sum(os.path.getsize(f) for f in job_filenames(job))
+  return run
+
+# Returns (seconds of one run, bytes of one run, peak memory of one run)
+def _measure(run, rows, repeat):
+  elapsed = []
+  for _ in range(repeat):
+    calls = 0
+    start = time.perf_counter()
+    while calls == 0 or time.perf_counter() - start < MIN_SECONDS:
+      size = run(rows)
+      calls += 1
+    elapsed.append((time.perf_counter() - start)/calls)
+  tracemalloc.start()
+  run(rows)
+  peak = tracemalloc.get_traced_memory()[1]
+  tracemalloc.stop()
+  return min(elapsed), size, peak
+
+def _rows(numbers, single_sample_size, quick):
+  return max((numbers // 10 if quick else numbers) // single_sample_size, 1)
+
+def _cases(args, directory):
+  for single_sample_size in args.single_sample_size:
+    for number_size in args.number_size:
+      for implementation, numbers in [('scalar', SCALAR_NUMBERS), ('batch', BATCH_NUMBERS)]:
+        for strategy in args.strategy:
+          name = '%s/%s/size_%d/number_size_%d' % (implementation, strategy, single_sample_size, number_size)
+          yield name, _case(implementation, strategy, single_sample_size, number_size), _rows(numbers, single_sample_size, args.quick)
+    for output_format in args.format:
+      name = 'file/%s/size_%d/number_size_%d' % (output_format, single_sample_size, NUMBER_SIZE)
+      yield name, _file_case(output_format, single_sample_size, directory), _rows(FILE_NUMBERS, single_sample_size, args.quick)
+
+# Returns the names of the cases that regressed
+def compare(results, baseline, threshold):
+  regressions = []
+  for name, result in sorted(results.items()):
+    if name not in baseline:
+      continue
+    before = baseline[name]
+    speed = result['rows_per_sec']/before['rows_per_sec'] - 1
+    memory = result['peak_bytes']/max(before['peak_bytes'], 1) - 1
+    regressed = speed < -threshold or (memory > threshold and result['peak_bytes'] - before['peak_bytes'] > MEMORY_NOISE_BYTES)
+    print("%-40s rows/s: %+7.1f%%  peak memory: %+7.1f%%%s" % (name, 100*speed, 100*memory, "  REGRESSION" if regressed else ""))
+    if regressed:
+      regressions.append(name)
+  return regressions
+
+def main(argv=None):
+  parser = argparse.ArgumentParser()
+  parser.add_argument("--strategy", nargs="+", choices=STRATEGIES, default=STRATEGIES)
+  parser.add_argument("--single_sample_size", nargs="+", type=int, default=SINGLE_SAMPLE_SIZES)
+  parser.add_argument("--number_size", nargs="+", type=int, default=NUMBER_SIZES)
+  parser.add_argument("--format", nargs="*", choices=FORMATS, default=FORMATS, help="Formats of the file writing path, none to skip it")
+  parser.add_argument("--repeat", type=int, default=3)
+  parser.add_argument("--quick", help="Generate 10 times fewer rows in each case", action="store_true", default=False)
+  parser.add_argument("--save", help="Write the results to this JSON file")
+  parser.add_argument("--baseline", help="Compare the results with this JSON file (from --save)")
+  parser.add_argument("--threshold", type=float, default=THRESHOLD, help="Fraction of rows/s lost or peak memory gained that is a regression")
+  args = parser.parse_args(argv)
+
+  results = {}
+  with tempfile.TemporaryDirectory() as directory:
+    for name, run, rows in _cases(args, directory):
+      elapsed, size, peak = _measure(run, rows, args.repeat)
+      results[name] = {'rows': rows, 'seconds': elapsed, 'rows_per_sec': rows/elapsed, 'bytes_per_sec': size/elapsed, 'peak_bytes': peak}
+      print("%-40s %10.0f rows/s %8.1f MB/s %10.1f MB peak" % (name, rows/elapsed, size/elapsed/1e6, peak/1e6))
+
+  if args.save:
+    with open(args.save, mode='w') as results_file:
+      json.dump({
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.platform(),
+        'results': results,
+      }, results_file, indent=2, sort_keys=True)
+  if args.baseline:
+    with open(args.baseline) as baseline_file:
+      baseline = json.load(baseline_file)['results']
+    regressions = compare(results, baseline, args.threshold)
+    print("%d of %d cases regressed by more than %.0f%%" % (len(regressions), len([n for n in results if n in baseline]), 100*args.threshold))
+    return 1 if regressions else 0
+  return 0
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,76 @@
+# Benchmark of the database ingest (serial_hunter_ingest.py) on the SQLite fixture
+#
+# Writes a fixture of --samples samples to a temporary database, then for each
+# --fetch_rows reads all the numbers back:
+# * fromiter: fetch_number_chunks, np.fromiter straight from the row tuples
+# * array: np.array of each fetchmany list, the straightforward way
+# * ingest: the whole ingest with has_sequence_batch, and whether it finds the
+#   sequences the fixture was written with
+# in numbers/s
+#
+# python benchmarks/bench_ingest.py [--samples N] [--fetch_rows N ...] [--database FILE]
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from serial_hunter_config import SINGLE_SAMPLE_SIZE_50
+from serial_hunter_ingest import TABLE, ConnectionPool, create_sqlite_fixture, fetch_number_chunks, ingest, numbers_query
+
+def _fetch_array(cursor, fetch_rows):
+  while True:
+    rows = cursor.fetchmany(fetch_rows)
+    if not rows:
+      return
+    pairs = np.array(rows, dtype=np.int64)
+    yield pairs[:, 0], pairs[:, 1]
+
+# Returns (numbers/s, numbers) of reading the table with fetch
+def _read(pool, fetch, fetch_rows):
+  start = time.perf_counter()
+  numbers = 0
+  with pool.connection() as connection:
+    cursor = connection.cursor()
+    cursor.execute(*numbers_query())
+    for _, chunk in fetch(cursor, fetch_rows):
+      numbers += len(chunk)
+    cursor.close()
+  return numbers/(time.perf_counter() - start), numbers
+
+def main(argv=None):
+  parser = argparse.ArgumentParser()
+  parser.add_argument("--samples", type=int, default=40000)
+  parser.add_argument("--fetch_rows", nargs="+", type=int, default=[1000, 10000, 100000])
+  parser.add_argument("--database", help="Reuse this fixture instead of writing a temporary one", default=None)
+  args = parser.parse_args(argv)
+
+  with tempfile.TemporaryDirectory() as temp_dir:
+    database = args.database
+    if database is None:
+      database = os.path.join(temp_dir, 'numbers.db')
+      start = time.perf_counter()
+      create_sqlite_fixture(database, args.samples)
+      print("fixture: %d numbers in %.2fs" % (args.samples*SINGLE_SAMPLE_SIZE_50, time.perf_counter() - start))
+    connection = sqlite3.connect(database)
+    expected = np.array([class_name != 'none' for class_name, in connection.execute("SELECT class FROM %s_labels ORDER BY sample" % TABLE)])
+    connection.close()
+
+    with ConnectionPool(lambda: sqlite3.connect(database)) as pool:
+      for fetch_rows in args.fetch_rows:
+        fromiter_rate, numbers = _read(pool, fetch_number_chunks, fetch_rows)
+        array_rate, _ = _read(pool, _fetch_array, fetch_rows)
+        start = time.perf_counter()
+        scores = np.concatenate([scores for _, scores, _ in ingest(pool, fetch_rows=fetch_rows)])
+        ingest_rate = numbers/(time.perf_counter() - start)
+        print("fetch_rows: %6d  fromiter: %9.0f  array: %9.0f  ingest: %9.0f numbers/s  sequences found: %s" % (
+          fetch_rows, fromiter_rate, array_rate, ingest_rate, np.array_equal(scores, expected)))
+
+if __name__ == "__main__":
+  main()
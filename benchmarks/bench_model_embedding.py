@@ -0,0 +1,67 @@
+# Benchmark of the NumberEmbedding path of predict_samples (serial_hunter_model.py)
+#
+# Scores a stream of batches with the digits path (numbers_to_digit_tensor and
+# the Conv2D matrix products) and with the embedding (table lookups and the
+# cache), for batches of --rows samples where --repeat of the numbers were
+# already in the previous batch, e.g., the overlapping windows of numbers
+# pulled every minute:
+# * ms per batch of each path, and how much faster the embedding is
+# * Cache hit rate
+# * Largest difference between the probabilities of the two paths
+#
+# python benchmarks/bench_model_embedding.py [--model FILE] [--rows N ...] [--repeat F ...] [--batches N]
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from serial_hunter_config import MIN_NUMBER, MAX_NUMBER, SINGLE_SAMPLE_SIZE_50
+from serial_hunter_model import MODEL_FILENAME, load_model
+
+# Returns batches of rows samples, repeat of the numbers of each batch taken from the one before
+def _batches(batches, rows, repeat, rng):
+  batch = rng.integers(MIN_NUMBER, MAX_NUMBER, (rows, SINGLE_SAMPLE_SIZE_50))
+  result = [batch]
+  for _ in range(batches - 1):
+    batch = batch.copy()
+    new = rng.random(batch.shape) >= repeat
+    batch[new] = rng.integers(MIN_NUMBER, MAX_NUMBER, int(new.sum()))
+    result.append(batch)
+  return result
+
+# Returns (ms per batch, probabilities of the last batch)
+def _score(model, batches):
+  start = time.perf_counter()
+  for batch in batches:
+    probabilities = model.predict_samples(batch)
+  return (time.perf_counter() - start)/len(batches)*1000, probabilities
+
+def main(argv=None):
+  parser = argparse.ArgumentParser()
+  parser.add_argument("--model", default=MODEL_FILENAME)
+  parser.add_argument("--rows", nargs="+", type=int, default=[1, 64, 512])
+  parser.add_argument("--repeat", nargs="+", type=float, default=[0, 0.5, 0.9, 1])
+  parser.add_argument("--batches", type=int, default=50)
+  args = parser.parse_args(argv)
+
+  digits_model = load_model(args.model, embedding=False)
+  for rows in args.rows:
+    for repeat in args.repeat:
+      batches = _batches(args.batches, rows, repeat, np.random.default_rng(0))
+      # A new model each time, so the cache starts empty
+      embedding_model = load_model(args.model)
+      if embedding_model.embedding is None:
+        sys.exit("The first layer of %s does not work on one number at a time" % args.model)
+      digits_ms, expected = _score(digits_model, batches)
+      embedding_ms, probabilities = _score(embedding_model, batches)
+      embedding = embedding_model.embedding
+      print("rows: %4d repeat: %4.2f  digits: %8.3f ms  embedding: %8.3f ms  %5.2fx  hits: %5.1f%%  max diff: %.1e" % (
+        rows, repeat, digits_ms, embedding_ms, digits_ms/embedding_ms, 100.0*embedding.hits/(embedding.hits + embedding.misses), np.abs(probabilities - expected).max()))
+
+if __name__ == "__main__":
+  main()
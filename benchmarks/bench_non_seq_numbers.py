@@ -0,0 +1,110 @@
+# Benchmark of generate_non_seq_numbers
+#
+# Compares the block patching sampler it used to have (kept below as
+# generate_non_seq_numbers_before) with the current rejection-free one and
+# its batch version, on:
+# * Throughput, non sequence numbers per second
+# * Accidental sequences, samples whose longest chain (serial_hunter_detector.py)
+#   is not exactly the sequence that was put in
+# * Numbers within max_gap of another number or out of [min_number, max_number)
+# * Failures when the sequence is right at min_number or max_number
+#
+# python benchmarks/bench_non_seq_numbers.py [--samples N] [--single_sample_size N] [--min_number N --max_number N]
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from serial_hunter_batch import generate_non_seq_numbers_batch
+from serial_hunter_config import MIN_NUMBER, MAX_NUMBER, THRESHOLD_GAP, THRESHOLD_SEQUENCE, SINGLE_SAMPLE_SIZE_50
+from serial_hunter_detector import longest_sequence_batch
+from serial_hunter_seq import generate_non_seq_numbers, generate_seq
+
+# generate_non_seq_numbers as it was, the block is picked on a random side of
+# the sequence and moved by 4 blocks if it is next to the previous one
+def generate_non_seq_numbers_before(seq_arr, min_number, max_number, max_gap=THRESHOLD_GAP, single_sample_size=SINGLE_SAMPLE_SIZE_50, rng=random):
+  non_seq_numbers = []
+  number_range = max_number - min_number
+  last_block = number_range//max_gap
+  seq_arr_block_number_start = (seq_arr[0] - min_number)//max_gap
+  seq_arr_block_number_end = (seq_arr[-1] - min_number)//max_gap
+  last_block_number = seq_arr_block_number_start
+  for i in range(single_sample_size - len(seq_arr)):
+    block_number = rng.randint(0, seq_arr_block_number_start-1) if rng.randint(0,1) == 0 else rng.randint(seq_arr_block_number_end+1, last_block)
+    if (block_number >= last_block_number-1) and (block_number <= last_block_number+1):
+      block_number += 4
+      if block_number-4 > last_block:
+        block_number -= 8
+        if block_number < 0:
+          raise ValueError("Not enough number range")
+    number = min_number + rng.randint(block_number*max_gap, (block_number+1)*max_gap)
+    non_seq_numbers.append(number)
+    last_block_number = block_number
+  return non_seq_numbers
+
+def _check(name, seq_arr, non_seq_arr, elapsed, min_number, max_number, max_gap):
+  sample_arr = np.concatenate([seq_arr, non_seq_arr], axis=1)
+  longest = longest_sequence_batch(sample_arr, max_gap)
+  # Any two non sequence numbers within max_gap of each other
+  sorted_non_seq = np.sort(non_seq_arr, axis=1)
+  close = (np.diff(sorted_non_seq, axis=1) <= max_gap).any(axis=1)
+  out_of_range = ((non_seq_arr < min_number) | (non_seq_arr >= max_number)).any(axis=1)
+  print("%-8s %12.0f numbers/s  accidental sequence: %6.3f%%  close numbers: %6.3f%%  out of range: %6.3f%%" % (
+    name, non_seq_arr.size/elapsed, 100*np.mean(longest != seq_arr.shape[1]), 100*np.mean(close), 100*np.mean(out_of_range)))
+
+def _edge_failures(function, samples, seq_count, min_number, max_number, max_gap, single_sample_size):
+  failures = 0
+  for i in range(samples):
+    start = min_number if i % 2 == 0 else max_number - 1 - (seq_count-1)*max_gap
+    seq_arr = [start + j*max_gap for j in range(seq_count)]
+    try:
+      function(seq_arr, min_number, max_number, max_gap, single_sample_size)
+    except (ValueError, IndexError):
+      failures += 1
+  return failures
+
+def main():
+  parser = argparse.ArgumentParser()
+  parser.add_argument("--samples", type=int, default=20000)
+  parser.add_argument("--single_sample_size", type=int, default=SINGLE_SAMPLE_SIZE_50)
+  parser.add_argument("--min_number", type=int, default=MIN_NUMBER)
+  parser.add_argument("--max_number", type=int, default=MAX_NUMBER)
+  parser.add_argument("--seed", type=int, default=0)
+  args = parser.parse_args()
+  min_number, max_number, max_gap = args.min_number, args.max_number, THRESHOLD_GAP
+  # Keep the numbers below max_number, like the batch engine
+  random.seed(args.seed)
+  seq_arr = np.array([generate_seq(THRESHOLD_SEQUENCE, min_number, max_number - 1) for _ in range(args.samples)], dtype=np.int64)
+
+  for name, function in [('before', generate_non_seq_numbers_before), ('scalar', generate_non_seq_numbers)]:
+    rows, non_seq_arr = [], []
+    start = time.perf_counter()
+    for row, seq in enumerate(seq_arr.tolist()):
+      try:
+        non_seq_arr.append(function(seq, min_number, max_number, max_gap, args.single_sample_size))
+        rows.append(row)
+      except ValueError:
+        pass
+    elapsed = time.perf_counter() - start
+    if len(rows) < len(seq_arr):
+      print("%-8s %d of %d samples failed" % (name, len(seq_arr) - len(rows), len(seq_arr)))
+    _check(name, seq_arr[rows], np.array(non_seq_arr, dtype=np.int64), elapsed, min_number, max_number, max_gap)
+
+  rng = np.random.default_rng(args.seed)
+  start = time.perf_counter()
+  non_seq_arr = generate_non_seq_numbers_batch(seq_arr, min_number, max_number, max_gap, args.single_sample_size, rng)
+  _check('batch', seq_arr, non_seq_arr, time.perf_counter() - start, min_number, max_number, max_gap)
+
+  edge_samples = 1000
+  for name, function in [('before', generate_non_seq_numbers_before), ('scalar', generate_non_seq_numbers)]:
+    failures = _edge_failures(function, edge_samples, THRESHOLD_SEQUENCE, min_number, max_number, max_gap, args.single_sample_size)
+    print("%-8s sequence at min_number / max_number: %d of %d failed" % (name, failures, edge_samples))
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,181 @@
+# Batch (vectorized) version of the generators in serial_hunter_seq.py
+#
+# Instead of producing one sample (a list of single_sample_size numbers) per call,
+# every function here produces n_rows samples at once as an
+# (n_rows, single_sample_size) int64 matrix, together with the matrix of the
+# positions (column indexes) where the sequence elements were placed.
+#
+# All randomness comes from the rng argument, which is anything that offers the
+# numpy.random.Generator methods integers(low, high, size, endpoint) and
+# permuted(x, axis). When rng is None a fresh numpy Generator is used.
+#
+# NOTE: Unlike the per-sample functions, max_number is treated as exclusive so
+# that every generated number has exactly NUMBER_SIZE digits
+
+import math
+
+import numpy as np
+
+from serial_hunter_config import BATCH_NUMBER_COUNT, THRESHOLD_GAP
+from serial_hunter_profile import stage
+
+PLACEMENT_SPARSE = 'sparse'
+PLACEMENT_HEAD_HEAVY = 'head_heavy'
+PLACEMENT_TAIL_HEAVY = 'tail_heavy'
+PLACEMENT_PCT = 'pct'
+
+def _get_rng(rng):
+  return np.random.default_rng() if rng is None else rng
+
+# Batch version of get_seq_start
+# Returns an (n_rows,) array of random first numbers in sequence
+def get_seq_start_batch(n_rows, seq_count, min_number, max_number, max_gap=THRESHOLD_GAP, rng=None):
+  rng = _get_rng(rng)
+  latest_first_seq_elem = max_number - 1 - (seq_count-1)*max_gap
+  if latest_first_seq_elem < min_number:
+    raise ValueError("The distance min_number: %d and max_number: %d is not enough to support %d elements in sequence with max_gap: %d" % (min_number, max_number, seq_count, max_gap))
+  return rng.integers(min_number, latest_first_seq_elem, size=n_rows, endpoint=True, dtype=np.int64)
+
+# Batch version of generate_seq, returns an (n_rows, seq_count) int64 matrix,
+# one sequence per row
+# seq_pos: Where the sequence is in the position, same as generate_seq_with_pos_index
+#          If 3 then the sequence is 3 positions from the right, i.e., 104233, 104333, 104433, etc.
+#          The digits to the right of the sequence are random but fixed within a row
+def generate_seq_batch(n_rows, seq_count, min_number, max_number, seq_pos=0, min_gap=1, max_gap=THRESHOLD_GAP, in_order=True, rng=None):
+  rng = _get_rng(rng)
+  seq_pos = int(seq_pos)
+  scale = 10**seq_pos
+  # The incrementing part is the number with the seq_pos right-most digits removed
+  min_head = -(-min_number // scale)
+  max_head = max_number // scale
+  if max_head <= min_head:
+    raise ValueError("seq_pos: %d, which is the how far from the right the sequence patter happens is too large for min_number: %d and max_number: %d" % (seq_pos, min_number, max_number))
+  seq_arr = np.empty((n_rows, seq_count), dtype=np.int64)
+  seq_arr[:, 0] = get_seq_start_batch(n_rows, seq_count, min_head, max_head, max_gap, rng)
+  if seq_count > 1:
+    gaps = rng.integers(min_gap, max_gap, size=(n_rows, seq_count-1), endpoint=True, dtype=np.int64)
+    seq_arr[:, 1:] = seq_arr[:, :1] + np.cumsum(gaps, axis=1)
+  if seq_pos > 0:
+    suffix = rng.integers(0, scale, size=(n_rows, 1), dtype=np.int64)
+    seq_arr = seq_arr*scale + suffix
+  if not in_order:
+    seq_arr = rng.permuted(seq_arr, axis=1)
+  return seq_arr
+
+# Batch version of generate_non_seq_numbers
+# Same block scheme: the number range is divided into blocks of max_gap
+# numbers, the blocks of the row's sequence (and the ones next to them) are
+# excluded, and every number is picked from its own block, no two of them
+# next to each other. The numbers of two such blocks are more than max_gap
+# apart, so the only sequence in the sample is the one that is put in it
+#
+# Picking count blocks with at least one block between any two is done without
+# retries: draw count positions among the available - 2*(count-1) allowed
+# blocks, sort them, and add 2*i to the i-th one, then skip over the excluded
+# blocks. The numbers are then shuffled so their order says nothing about them
+# seq_batch: (n_rows, seq_count) sequences, the rows do not need to be in order
+# Returns an (n_rows, single_sample_size - seq_count) int64 matrix
+def generate_non_seq_numbers_batch(seq_batch, min_number, max_number, max_gap=THRESHOLD_GAP, single_sample_size=BATCH_NUMBER_COUNT, rng=None):
+  rng = _get_rng(rng)
+  seq_batch = np.asarray(seq_batch, dtype=np.int64)
+  n_rows, seq_count = seq_batch.shape
+  count = single_sample_size - seq_count
+  if count <= 0:
+    return np.empty((n_rows, 0), dtype=np.int64)
+  block_count = (max_number - min_number)//max_gap
+  seq_block_start = np.maximum((seq_batch.min(axis=1) - min_number)//max_gap - 1, 0)
+  seq_block_end = np.minimum((seq_batch.max(axis=1) - min_number)//max_gap + 1, block_count - 1)
+  excluded = seq_block_end - seq_block_start + 1
+  positions = block_count - excluded - 2*(count - 1)
+  if np.any(positions <= 0):
+    row = int(np.argmin(positions))
+    raise ValueError("The distance min_number: %d (block number: %d) and max_number: %d (block number: %d) with sequence from: %d (block number: %d) to: %d (block number: %d) does not have enough number range to produce %d numbers not in the sequence" % (min_number, 0, max_number, block_count - 1, seq_batch[row].min(), seq_block_start[row], seq_batch[row].max(), seq_block_end[row], count))
+  block = np.sort(rng.integers(0, positions[:, None], size=(n_rows, count), dtype=np.int64), axis=1)
+  block += 2*np.arange(count, dtype=np.int64)
+  block += np.where(block >= seq_block_start[:, None], excluded[:, None], 0)
+  non_seq_numbers = min_number + block*max_gap + rng.integers(0, max_gap, size=(n_rows, count), dtype=np.int64)
+  return rng.permuted(non_seq_numbers, axis=1)
+
+# Put the sequence elements at the given column indexes and fill every other
+# column, in order, with the non-sequence numbers
+def _scatter_seq(seq_batch, seq_idx_arr, non_seq_arr, single_sample_size):
+  n_rows = seq_batch.shape[0]
+  sample_arr = np.empty((n_rows, single_sample_size), dtype=np.int64)
+  is_seq = np.zeros((n_rows, single_sample_size), dtype=bool)
+  rows = np.arange(n_rows)[:, None]
+  is_seq[rows, seq_idx_arr] = True
+  sample_arr[rows, seq_idx_arr] = seq_batch
+  sample_arr[~is_seq] = non_seq_arr.ravel()
+  return sample_arr
+
+# Batch version of generate_seq_sparse
+# Returns (sample_arr, seq_idx_arr) where sample_arr is (n_rows, single_sample_size)
+# and seq_idx_arr is (n_rows, seq_count) containing the columns of the sequence elements
+def generate_seq_sparse_batch(seq_batch, min_number, max_number, max_gap=THRESHOLD_GAP, single_sample_size=BATCH_NUMBER_COUNT, rng=None):
+  seq_batch = np.asarray(seq_batch, dtype=np.int64)
+  n_rows, seq_count = seq_batch.shape
+  with stage('non_seq'):
+    non_seq_arr = generate_non_seq_numbers_batch(seq_batch, min_number, max_number, max_gap, single_sample_size, rng)
+  with stage('placement'):
+    seq_elem_distance = math.floor(single_sample_size/seq_count)
+    seq_idx_arr = np.broadcast_to(np.arange(seq_count, dtype=np.int64)*seq_elem_distance, (n_rows, seq_count))
+    return _scatter_seq(seq_batch, seq_idx_arr, non_seq_arr, single_sample_size), np.array(seq_idx_arr)
+
+def generate_seq_tail_heavy_batch(seq_batch, min_number, max_number, max_gap=THRESHOLD_GAP, single_sample_size=BATCH_NUMBER_COUNT, rng=None):
+  return generate_seq_head_within_pct_position_batch(seq_batch, min_number, max_number, 51, 100, max_gap, single_sample_size, rng)
+
+def generate_seq_head_heavy_batch(seq_batch, min_number, max_number, max_gap=THRESHOLD_GAP, single_sample_size=BATCH_NUMBER_COUNT, rng=None):
+  return generate_seq_head_within_pct_position_batch(seq_batch, min_number, max_number, 0, 50, max_gap, single_sample_size, rng)
+
+# Batch version of generate_seq_head_within_pct_position
+# The random space before each sequence element is drawn for all rows at once,
+# so there is one vectorized draw per sequence element instead of per row
+def generate_seq_head_within_pct_position_batch(seq_batch, min_number, max_number, start_pct, end_pct, max_gap=THRESHOLD_GAP, single_sample_size=BATCH_NUMBER_COUNT, rng=None):
+  rng = _get_rng(rng)
+  seq_batch = np.asarray(seq_batch, dtype=np.int64)
+  n_rows, seq_count = seq_batch.shape
+  # Sequence numbers can start from this (including) this index
+  start_idx = math.floor(start_pct*single_sample_size/100)
+  end_idx = math.ceil(end_pct*single_sample_size/100)
+  if (end_idx - start_idx) < seq_count:
+    # There are too many seq numbers to fit into the range
+    raise ValueError("The space available within start_idx: %d (start_pct: %d), end_idx: %d (end_pct: %d), but len(seq_arr): %d, which is the number of sequential numbers that we want to squeeze into space avaialble" % (start_idx, start_pct, end_idx, end_pct, seq_count))
+  with stage('non_seq'):
+    non_seq_arr = generate_non_seq_numbers_batch(seq_batch, min_number, max_number, max_gap, single_sample_size, rng)
+  with stage('placement'):
+    seq_idx_arr = np.empty((n_rows, seq_count), dtype=np.int64)
+    remain_space_between_seq = np.full(n_rows, end_idx - start_idx - seq_count, dtype=np.int64)
+    prev_seq_idx = np.full(n_rows, start_idx-1, dtype=np.int64)
+    for i in range(seq_count):
+      # Randomly choose how far away from current elem the next number in the seq is
+      space = rng.integers(0, remain_space_between_seq, endpoint=True, dtype=np.int64)
+      prev_seq_idx = prev_seq_idx + space + 1
+      seq_idx_arr[:, i] = prev_seq_idx
+      remain_space_between_seq -= space
+    return _scatter_seq(seq_batch, seq_idx_arr, non_seq_arr, single_sample_size), seq_idx_arr
+
+# Expand the sequence positions into the '0'/'1' position index columns written by --with_pos,
+# i.e., same as convert_position_arr_to_binary with least_significant_on_left for every row
+def seq_idx_to_pos_index_arr(seq_idx_arr, single_sample_size):
+  seq_idx_arr = np.asarray(seq_idx_arr)
+  pos_index_arr = np.zeros((seq_idx_arr.shape[0], single_sample_size), dtype=np.uint8)
+  pos_index_arr[np.arange(seq_idx_arr.shape[0])[:, None], seq_idx_arr] = 1
+  return pos_index_arr
+
+# Generate n_rows complete samples in one call
+# placement: PLACEMENT_SPARSE, PLACEMENT_HEAD_HEAVY, PLACEMENT_TAIL_HEAVY or
+#            PLACEMENT_PCT (which uses start_pct and end_pct)
+# Returns (sample_arr, seq_idx_arr)
+def generate_samples_batch(n_rows, placement, seq_count, min_number, max_number, seq_pos=0, min_gap=1, max_gap=THRESHOLD_GAP, in_order=True, single_sample_size=BATCH_NUMBER_COUNT, start_pct=None, end_pct=None, rng=None):
+  rng = _get_rng(rng)
+  with stage('seq'):
+    seq_batch = generate_seq_batch(n_rows, seq_count, min_number, max_number, seq_pos, min_gap, max_gap, in_order, rng)
+  if placement == PLACEMENT_SPARSE:
+    return generate_seq_sparse_batch(seq_batch, min_number, max_number, max_gap, single_sample_size, rng)
+  elif placement == PLACEMENT_HEAD_HEAVY:
+    return generate_seq_head_heavy_batch(seq_batch, min_number, max_number, max_gap, single_sample_size, rng)
+  elif placement == PLACEMENT_TAIL_HEAVY:
+    return generate_seq_tail_heavy_batch(seq_batch, min_number, max_number, max_gap, single_sample_size, rng)
+  elif placement == PLACEMENT_PCT:
+    return generate_seq_head_within_pct_position_batch(seq_batch, min_number, max_number, start_pct, end_pct, max_gap, single_sample_size, rng)
+  raise ValueError("Unknown placement: %s" % placement)
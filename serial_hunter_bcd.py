@@ -0,0 +1,145 @@
+# Packed decimal samples
+#
+# EBCDIC_MODE (serial_hunter_config.py) picks how the digits are packed:
+# * ENCODING_BCD (EBCDIC_MODE): packed BCD, 4 bits per digit, 2 digits in a
+#   byte, the first digit in the high nibble
+# * ENCODING_7BIT: every 2 digits (0 to 99) in 7 bits, most significant bit first
+# The digits of all the numbers of a sample (number_size each, most significant
+# first, same as numbers_to_digits) are packed one after another, padded with
+# 0 to a whole pair and a whole byte, e.g., a sample of 50 numbers of 15 digits
+# is 375 bytes in BCD and 329 bytes in 7-bit, against 800 as int64 and 800 as
+# CSV text
+#
+# Unpacking gives the digits straight away (the CNN input, see
+# packed_to_digit_tensor), with a nibble split or a bit unpack and a division
+# by 10, and decode_samples gives the numbers (the detector input)
+#
+# The bcd data files (FORMAT_BCD, serial_hunter_pool.py) are:
+# * <name>.bcd: (rows, sample_bytes) uint8 packed samples, in the .npy format
+# * <name>_labels.npy: (rows, len(CLASSES)) uint8 one-hot outcome, as the digits files
+# in the encoding of EBCDIC_MODE, which has to be the same when reading them
+
+import numpy as np
+
+from serial_hunter_config import CLASSES, EBCDIC_MODE, NUMBER_SIZE
+from serial_hunter_digits import digits_to_numbers, labels_filename, labels_to_one_hot, numbers_to_digits
+
+ENCODING_BCD = 'bcd'
+ENCODING_7BIT = '7bit'
+ENCODINGS = [ENCODING_BCD, ENCODING_7BIT]
+DEFAULT_ENCODING = ENCODING_BCD if EBCDIC_MODE else ENCODING_7BIT
+
+def _check_encoding(encoding):
+  if encoding not in ENCODINGS:
+    raise ValueError("encoding: %s must be one of %s" % (encoding, ENCODINGS))
+
+# Bytes of a packed sample of cols numbers
+def sample_bytes(cols, number_size=NUMBER_SIZE, encoding=DEFAULT_ENCODING):
+  _check_encoding(encoding)
+  pairs = (cols*number_size + 1) // 2
+  return pairs if encoding == ENCODING_BCD else (pairs*7 + 7) // 8
+
+# Numbers in a packed sample of nbytes bytes, the inverse of sample_bytes
+# Numbers of 3 digits or more take at least a byte each, so only very short
+# numbers can be ambiguous, e.g., 1 or 2 numbers of 1 digit are both 1 byte
+def sample_cols(nbytes, number_size=NUMBER_SIZE, encoding=DEFAULT_ENCODING):
+  # A digit takes at least 3.5 bits
+  cols = [c for c in range(nbytes*16 // (7*number_size) + 2) if sample_bytes(c, number_size, encoding) == nbytes]
+  if not cols:
+    raise ValueError("%d bytes is not a packed sample of %d digit numbers in %s" % (nbytes, number_size, encoding))
+  if len(cols) > 1:
+    raise ValueError("%d bytes can be %s numbers of %d digits in %s, give cols" % (nbytes, cols, number_size, encoding))
+  return cols[0]
+
+# 8 pairs of 7 bits are 7 bytes, so the 7-bit encoding is done 8 pairs at a
+# time in a uint64, most significant pair (and byte) first
+_GROUP_PAIRS = 8
+_GROUP_BYTES = 7
+_PAIR_SHIFTS = np.arange(_GROUP_PAIRS - 1, -1, -1, dtype=np.uint64)*np.uint64(7)
+_BYTE_SHIFTS = np.arange(_GROUP_BYTES - 1, -1, -1, dtype=np.uint64)*np.uint64(8)
+
+# Pad the columns of a (rows, n) array with 0 to a multiple of size, and split them into groups of size
+def _groups(arr, size):
+  padded = np.zeros((len(arr), -(-arr.shape[1] // size)*size), dtype=arr.dtype)
+  padded[:, :arr.shape[1]] = arr
+  return padded.reshape(len(arr), -1, size)
+
+# digits: (rows, digits) 0 to 9
+# Returns (rows, sample_bytes) uint8
+def pack_digits(digits, encoding=DEFAULT_ENCODING):
+  _check_encoding(encoding)
+  digits = np.asarray(digits, dtype=np.uint8)
+  if digits.shape[1] % 2:
+    digits = np.concatenate([digits, np.zeros((len(digits), 1), dtype=np.uint8)], axis=1)
+  if encoding == ENCODING_BCD:
+    return (digits[:, 0::2] << 4) | digits[:, 1::2]
+  pairs = digits[:, 0::2]*10 + digits[:, 1::2]
+  words = np.bitwise_or.reduce(_groups(pairs, _GROUP_PAIRS).astype(np.uint64) << _PAIR_SHIFTS, axis=2)
+  packed = ((words[:, :, None] >> _BYTE_SHIFTS) & np.uint64(0xff)).astype(np.uint8)
+  return packed.reshape(len(pairs), -1)[:, :sample_bytes(pairs.shape[1]*2, 1, ENCODING_7BIT)]
+
+# packed: (rows, sample_bytes) uint8
+# Returns (rows, cols*number_size) uint8 digits
+def unpack_digits(packed, cols, number_size=NUMBER_SIZE, encoding=DEFAULT_ENCODING):
+  _check_encoding(encoding)
+  packed = np.asarray(packed, dtype=np.uint8)
+  if packed.shape[1] != sample_bytes(cols, number_size, encoding):
+    raise ValueError("Packed samples of %d bytes are not %d numbers of %d digits in %s" % (packed.shape[1], cols, number_size, encoding))
+  rows, n_digits = len(packed), cols*number_size
+  if encoding == ENCODING_BCD:
+    digits = np.empty((rows, packed.shape[1]*2), dtype=np.uint8)
+    np.right_shift(packed, 4, out=digits[:, 0::2])
+    np.bitwise_and(packed, 0x0f, out=digits[:, 1::2])
+    digits = digits[:, :n_digits]
+    invalid = digits > 9
+  else:
+    n_pairs = (n_digits + 1) // 2
+    words = np.bitwise_or.reduce(_groups(packed, _GROUP_BYTES).astype(np.uint64) << _BYTE_SHIFTS, axis=2)
+    pairs = ((words[:, :, None] >> _PAIR_SHIFTS) & np.uint64(0x7f)).astype(np.uint8).reshape(rows, -1)[:, :n_pairs]
+    invalid = pairs > 99
+    digits = np.empty((rows, n_pairs*2), dtype=np.uint8)
+    np.floor_divide(pairs, 10, out=digits[:, 0::2])
+    np.remainder(pairs, 10, out=digits[:, 1::2])
+    digits = digits[:, :n_digits]
+  if np.any(invalid):
+    raise ValueError("Packed samples have %d digits that are not 0 to 9 (%s)" % (np.count_nonzero(invalid), encoding))
+  return digits
+
+# sample_arr: (rows, cols) numbers of number_size digits
+# Returns (rows, sample_bytes) uint8
+def encode_samples(sample_arr, number_size=NUMBER_SIZE, encoding=DEFAULT_ENCODING):
+  return pack_digits(numbers_to_digits(np.atleast_2d(sample_arr), number_size), encoding)
+
+# cols: Numbers in each sample, found from the bytes if None (see sample_cols)
+# Returns (rows, cols) int64 numbers, e.g., for serial_hunter_detector.py
+def decode_samples(packed, number_size=NUMBER_SIZE, encoding=DEFAULT_ENCODING, cols=None):
+  packed = np.atleast_2d(packed)
+  cols = sample_cols(packed.shape[1], number_size, encoding) if cols is None else cols
+  return digits_to_numbers(unpack_digits(packed, cols, number_size, encoding), number_size)
+
+# Same as numbers_to_digit_tensor, (rows, 1, cols*number_size, 1), from the packed samples
+def packed_to_digit_tensor(packed, number_size=NUMBER_SIZE, encoding=DEFAULT_ENCODING, cols=None):
+  packed = np.atleast_2d(packed)
+  cols = sample_cols(packed.shape[1], number_size, encoding) if cols is None else cols
+  digits = unpack_digits(packed, cols, number_size, encoding)
+  return digits.reshape(digits.shape[0], 1, digits.shape[1], 1)
+
+# Create both files sized for rows samples of cols numbers
+def create_bcd_dataset(filename, rows, cols, number_size=NUMBER_SIZE, encoding=DEFAULT_ENCODING):
+  np.lib.format.open_memmap(filename, mode='w+', dtype=np.uint8, shape=(rows, sample_bytes(cols, number_size, encoding))).flush()
+  np.lib.format.open_memmap(labels_filename(filename), mode='w+', dtype=np.uint8, shape=(rows, len(CLASSES))).flush()
+
+# Memory map both files
+# Returns (packed, Y)
+def open_bcd_dataset(filename, mode='r'):
+  return np.load(filename, mmap_mode=mode), np.load(labels_filename(filename), mmap_mode=mode)
+
+# Write the rows [start, start + len(sample_arr)) of a file made by create_bcd_dataset
+# labels: Class index of each row
+def write_bcd_rows(filename, start, sample_arr, labels, number_size=NUMBER_SIZE, encoding=DEFAULT_ENCODING):
+  packed, y = open_bcd_dataset(filename, mode='r+')
+  end = start + len(sample_arr)
+  packed[start:end] = encode_samples(sample_arr, number_size, encoding)
+  y[start:end] = labels_to_one_hot(labels)
+  packed.flush()
+  y.flush()
@@ -0,0 +1,93 @@
+# Binary columnar data file format
+#
+# Same content as the CSV data files, but stored so that a training loader can
+# memory map it (np.memmap) and use it without parsing any text
+#
+# Layout (little endian):
+# * Header, HEADER_SIZE bytes
+#   * magic: b'SHUNTBIN'
+#   * version, header size
+#   * label: Index of the class (in CLASSES) of all the rows, or -1 if the rows have different classes
+#   * rows, cols (numbers in each sample), mask_words (uint64 words in each position mask)
+#   * NUMBER_SIZE and THRESHOLD_GAP the data was generated with
+# * samples: (rows, cols) int64
+# * pos_mask: (rows, mask_words) uint64, bit i (least significant first) is set
+#   if the number in column i is part of the sequence (PositionMask(pos_mask, cols))
+# * labels: (rows,) uint8, index of the class (in CLASSES) of each row
+
+import struct
+
+import numpy as np
+
+from serial_hunter_config import CLASSES, NUMBER_SIZE, THRESHOLD_GAP
+from serial_hunter_mask import PositionMask, mask_words
+
+MAGIC = b'SHUNTBIN'
+VERSION = 1
+HEADER_SIZE = 64
+HEADER_FORMAT = '<8sHHiQIIII'
+MIXED_LABEL = -1
+
+CLASS_NAMES = list(CLASSES.keys())
+
+def _offsets(rows, cols):
+  samples_offset = HEADER_SIZE
+  pos_mask_offset = samples_offset + rows*cols*8
+  labels_offset = pos_mask_offset + rows*mask_words(cols)*8
+  return samples_offset, pos_mask_offset, labels_offset, labels_offset + rows
+
+# Pack the '0'/'1' position index columns into uint64 words, column i is bit
+# i, see serial_hunter_mask.py
+def pack_pos_index_arr(pos_index_arr):
+  return PositionMask.from_pos_index_arr(pos_index_arr).words
+
+# Create the file with its header, sized for rows samples of cols numbers
+# label: The class name of all the rows, or None if the rows have different classes
+def create_binary_dataset(filename, rows, cols, label=None):
+  label_index = MIXED_LABEL if label is None else CLASS_NAMES.index(label)
+  header = struct.pack(HEADER_FORMAT, MAGIC, VERSION, HEADER_SIZE, label_index, rows, cols, mask_words(cols), NUMBER_SIZE, THRESHOLD_GAP)
+  with open(filename, mode='wb') as bin_file:
+    bin_file.write(header.ljust(HEADER_SIZE, b'\0'))
+    bin_file.truncate(_offsets(rows, cols)[3])
+
+def read_binary_header(filename):
+  with open(filename, mode='rb') as bin_file:
+    magic, version, header_size, label, rows, cols, words, number_size, threshold_gap = struct.unpack(HEADER_FORMAT, bin_file.read(struct.calcsize(HEADER_FORMAT)))
+  if magic != MAGIC:
+    raise ValueError("%s is not a serial hunter binary data file" % filename)
+  if version != VERSION:
+    raise ValueError("%s has version: %d, only version: %d is supported" % (filename, version, VERSION))
+  return {
+    'label': None if label == MIXED_LABEL else CLASS_NAMES[label],
+    'rows': rows,
+    'cols': cols,
+    'mask_words': words,
+    'number_size': number_size,
+    'threshold_gap': threshold_gap,
+  }
+
+# Memory map the file
+# Returns (header, samples, pos_mask, labels), see the layout at the top
+# mode: 'r' for read only, 'r+' to write the rows
+def open_binary_dataset(filename, mode='r'):
+  header = read_binary_header(filename)
+  rows, cols = header['rows'], header['cols']
+  samples_offset, pos_mask_offset, labels_offset, _ = _offsets(rows, cols)
+  if rows == 0:
+    return header, np.empty((0, cols), dtype='<i8'), np.empty((0, header['mask_words']), dtype='<u8'), np.empty(0, dtype=np.uint8)
+  samples = np.memmap(filename, dtype='<i8', mode=mode, offset=samples_offset, shape=(rows, cols))
+  pos_mask = np.memmap(filename, dtype='<u8', mode=mode, offset=pos_mask_offset, shape=(rows, header['mask_words']))
+  labels = np.memmap(filename, dtype=np.uint8, mode=mode, offset=labels_offset, shape=(rows,))
+  return header, samples, pos_mask, labels
+
+# Write the rows [start, start + len(sample_arr)) of a file made by create_binary_dataset
+# labels: Class index of each row
+def write_binary_rows(filename, start, sample_arr, pos_index_arr, labels):
+  _, samples, pos_mask, label_arr = open_binary_dataset(filename, mode='r+')
+  end = start + len(sample_arr)
+  samples[start:end] = sample_arr
+  pos_mask[start:end] = pack_pos_index_arr(pos_index_arr)
+  label_arr[start:end] = labels
+  samples.flush()
+  pos_mask.flush()
+  label_arr.flush()
@@ -0,0 +1,58 @@
+# Incremental builds of the data files
+#
+# Every output file is keyed by a hash of everything its rows depend on:
+# * The job: placement (function), rows, seq_count, seq_pos, in_order, ... of
+#   its parts, single_sample_size, format, the stream its rows are drawn from
+# * NUMBER_SIZE, MIN_NUMBER, MAX_NUMBER and THRESHOLD_GAP
+# * The seed
+# * GENERATOR_VERSION
+# The key and the size of each file written are recorded in the cache file
+# (CACHE_FILENAME, next to the outputs) once the file is complete, and a job
+# whose files still have the recorded key and sizes is not generated again
+#
+# Only runs with a seed can be skipped, without one every run picks a new seed
+
+import hashlib
+import json
+import os
+
+from serial_hunter_config import NUMBER_SIZE, MIN_NUMBER, MAX_NUMBER, THRESHOLD_GAP
+
+CACHE_FILENAME = '.serial_hunter_cache.json'
+# Bump when a change to the generators gives different rows for the same job and seed
+GENERATOR_VERSION = 2
+
+def job_key(job, seed):
+  params = {
+    'generator_version': GENERATOR_VERSION,
+    'number_size': NUMBER_SIZE,
+    'min_number': MIN_NUMBER,
+    'max_number': MAX_NUMBER,
+    'threshold_gap': THRESHOLD_GAP,
+    'seed': seed,
+    'job': job,
+  }
+  return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+
+# Returns {output filename: {'key': job_key, 'files': {filename: size}}}
+def load_cache(cache_filename=CACHE_FILENAME):
+  if not os.path.exists(cache_filename):
+    return {}
+  with open(cache_filename) as cache_file:
+    return json.load(cache_file)
+
+def save_cache(cache, cache_filename=CACHE_FILENAME):
+  # Written to a temporary file first, so an interrupted run never leaves half a cache file
+  with open(cache_filename + '.tmp', mode='w') as cache_file:
+    json.dump(cache, cache_file, indent=2, sort_keys=True)
+  os.replace(cache_filename + '.tmp', cache_filename)
+
+# filenames: All the files written for the output, the output file first
+def is_up_to_date(cache, key, filenames):
+  entry = cache.get(filenames[0])
+  if entry is None or entry['key'] != key or sorted(entry['files']) != sorted(filenames):
+    return False
+  return all(os.path.exists(filename) and os.path.getsize(filename) == entry['files'][filename] for filename in filenames)
+
+def record_files(cache, key, filenames):
+  cache[filenames[0]] = {'key': key, 'files': {filename: os.path.getsize(filename) for filename in filenames}}
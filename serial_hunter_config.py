@@ -0,0 +1,41 @@
+# Constants shared by the generator script, the batch engine and everything
+# else that needs to agree on what a number / sample / sequence is.
+# NOTE: Importing this module has no side effects, so it is safe to use from
+# worker processes
+
+# E.g., 817031905898 has size of 12
+NUMBER_SIZE = 15
+MIN_NUMBER = 10**(NUMBER_SIZE-1)
+MAX_NUMBER = 10**NUMBER_SIZE
+# In each time the serial_hunter runs, what is the batch size the serial_hunter is processing
+# In practice, if we run the serial_hunter every 1 minute and we can expect 1000 numbers,
+# then set this to 1000
+BATCH_NUMBER_COUNT = 1000
+DATA_SIZE = 10
+# This meaans that gap up to and including is ok, e.g., if THRESHOLD_GAP = 4
+# then anything between and inclusive 1, 5 (1 + 4) is considered part of sequence
+THRESHOLD_GAP= 4
+
+# If elements in sequence is greater than this then serial sequence is considered detected
+THRESHOLD_SEQUENCE = 5
+# If EBCDIC_MODE then a 2 digit is represented by 8-bit (4-bit for each digit)
+# If not EBCDIC_MODE then a 2 digit is represented by 7-bit (7-bit can cover up to 128)
+EBCDIC_MODE = True
+
+SINGLE_SAMPLE_SIZE_50 = 50
+
+# For the "mid" data files, how far from the right the sequence happens, i.e.,
+# the seq_pos used with generate_seq_with_pos_index
+MID_SEQ_POS = 5
+
+# Multi-class outcome of a sample, based on the location of the sequence
+# (same mapping as the notebooks)
+CLASSES = { "none": [1,0,0,0], "sparse": [0,1,0,0], "head-heavy": [0,0,1,0], "tail-heavy": [0,0,0,1] }
+
+# There are data types, and the outcome (X: THRESHOLD_SEQUENCE, Y: THRESHOLD_GAP)
+# 1. Sequence < X, gap > Y, decision: false
+# 2. Sequence < X, gap < Y, decision: false
+# 3. Sequence > X, gap > Y, decision: false
+# 4. Sequence > X, gap < Y, decision: true, it is a sequence
+# See serial_hunter_near_miss.py
+DATA_TYPE_SIZE = 4
@@ -0,0 +1,371 @@
+# Reading the CSV data files back into matrices
+#
+# The data files are plain rows of non-negative integers (the '0'/'1' position
+# index columns, if any, then the numbers). Instead of parsing them number by
+# number (csv module, np.loadtxt), the bytes are parsed as a whole: every digit
+# is multiplied by its power of ten and the digits of each number are summed
+# with np.add.reduceat
+#
+# The data files are written with fixed width numbers, so when every line has
+# the same layout the bytes are instead viewed as a (rows, line length) matrix
+# and each column of numbers is one matrix product of its digits with the
+# powers of ten
+#
+# Writing goes the other way round: format_csv_rows turns a whole matrix into
+# the bytes csv.writer would write for it (',' between the numbers, '\r\n' at
+# the end of each row), 4 digits at a time from a lookup table of their ASCII
+# text. CSVWriter writes those blocks to the file from a background thread,
+# compressing them (gzip, or zstd with the zstandard package) on the way, so
+# the rows can be generated and formatted while the previous ones are written
+
+import gzip
+import os
+import queue
+import threading
+import zlib
+
+import numpy as np
+
+from serial_hunter_mask import POS_FORMAT_COLUMNS, POS_FORMAT_MASK, POS_FORMATS, WORD_BITS, PositionMask, mask_words
+from serial_hunter_profile import NULL_STAGE, count
+
+# Parse this many bytes (cut at a line end) at a time, the digit arrays are
+# about 8 times as large
+PARSE_CHUNK_BYTES = 1 << 22
+# uint64 holds any 19 digit number and the 20 digit ones up to 2**64 - 1,
+# e.g., a 64 bit position mask word
+MAX_DIGITS = 20
+POW10 = 10**np.arange(MAX_DIGITS, dtype=np.uint64)
+
+_NEWLINE = ord('\n')
+_SEPARATORS = np.array([ord(','), ord('\r'), _NEWLINE], dtype=np.uint8)
+
+def _parse_numbers(b):
+  digits = b - np.uint8(ord('0'))
+  is_digit = digits < 10
+  if not np.all(is_digit | np.isin(b, _SEPARATORS)):
+    raise ValueError("Only digits, ',' and line ends are supported")
+  digit_idx = np.flatnonzero(is_digit)
+  if len(digit_idx) == 0:
+    return np.empty(0, dtype=np.int64)
+  # A number starts where the previous digit is not right before it
+  starts = np.ones(len(digit_idx), dtype=bool)
+  starts[1:] = np.diff(digit_idx) > 1
+  offsets = np.flatnonzero(starts)
+  lengths = np.diff(np.append(offsets, len(digit_idx)))
+  if lengths.max() > MAX_DIGITS:
+    raise ValueError("Numbers with more than %d digits are not supported" % MAX_DIGITS)
+  # Power of ten of each digit, i.e., digits left until the end of its number
+  exponent = np.repeat(offsets + lengths, lengths) - np.arange(len(digit_idx)) - 1
+  numbers = np.add.reduceat(digits[digit_idx].astype(np.uint64)*POW10[exponent], offsets)
+  # A 20 digit number above 2**64 - 1 wraps around to below 10**19
+  if np.any((lengths == MAX_DIGITS) & (numbers < POW10[-1])):
+    raise ValueError("Numbers above %d are not supported" % np.iinfo(np.uint64).max)
+  return numbers.view(np.int64)
+
+# float64 matrix products are exact up to 2**53, i.e., any 15 digit number
+MAX_FLOAT_DIGITS = 15
+
+# Parse lines that all have the same layout, b being every line followed by
+# its line end, or return None if they do not
+def _parse_fixed_width(b, line_ends):
+  line_length = int(line_ends[0]) + 1
+  if len(b) % line_length != 0 or np.any(np.diff(line_ends) != line_length):
+    return None
+  lines = b.reshape(-1, line_length)
+  digits = lines - np.uint8(ord('0'))
+  is_digit = digits < 10
+  # Every line must have its digits and separators where the first line has them
+  if not np.all(is_digit == is_digit[0]):
+    return None
+  separator_cols = np.flatnonzero(~is_digit[0])
+  if not np.all(lines[:, separator_cols] == lines[0, separator_cols]):
+    return None
+  digit_cols = np.flatnonzero(is_digit[0])
+  new_field = np.append(True, np.diff(digit_cols) > 1)
+  starts = digit_cols[new_field]
+  widths = np.diff(np.append(np.flatnonzero(new_field), len(digit_cols)))
+  if widths.max() > MAX_FLOAT_DIGITS:
+    return None
+  numbers = np.empty((len(lines), len(starts)), dtype=np.int64)
+  for field, (start, width) in enumerate(zip(starts.tolist(), widths.tolist())):
+    numbers[:, field] = digits[:, start:start + width].astype(np.float64) @ 10.0**np.arange(width - 1, -1, -1)
+  return numbers
+
+# Parse CSV bytes of integers into a (rows, cols) int64 matrix, every row must have cols numbers
+# Numbers of 2**63 and up (only a position mask word can be that large) keep
+# their bits, .view(np.uint64) gives them back
+def parse_csv_numbers(data):
+  b = np.frombuffer(data, dtype=np.uint8)
+  if len(b) == 0:
+    return np.empty((0, 0), dtype=np.int64)
+  line_ends = np.flatnonzero(b == _NEWLINE)
+  if len(line_ends) == 0 or line_ends[-1] != len(b) - 1:
+    line_ends = np.append(line_ends, len(b) - 1)
+  if line_ends[-1] == len(b) - 1:
+    numbers = _parse_fixed_width(b, line_ends)
+    if numbers is not None:
+      return numbers
+  cols = len(_parse_numbers(b[:line_ends[0] + 1]))
+  # Cut the bytes at the line ends closest to every PARSE_CHUNK_BYTES
+  cuts = np.unique(line_ends[np.searchsorted(line_ends, np.arange(PARSE_CHUNK_BYTES, len(b), PARSE_CHUNK_BYTES)) - 1]) + 1
+  numbers = np.concatenate([_parse_numbers(chunk) for chunk in np.split(b, cuts)])
+  rows = len(numbers) // cols if cols else 0
+  if cols == 0 or rows*cols != len(numbers) or np.count_nonzero(b == ord(',')) != rows*(cols - 1):
+    raise ValueError("The rows do not all have %d numbers" % cols)
+  return numbers.reshape(rows, cols)
+
+# Number of numbers in each sample of a row of total_cols columns starting
+# with the position mask words
+def _mask_sample_cols(total_cols):
+  for words in range(1, total_cols):
+    if mask_words(total_cols - words) == words:
+      return total_cols - words
+  return None
+
+# The layouts the columns of arr can be in, as [(pos_format, sample cols)],
+# pos_format being None for no position index:
+# * None: Any columns, unless the first half only holds 0 and 1
+# * POS_FORMAT_COLUMNS: An even number of columns, the first half only 0 and 1,
+#   and not the second
+# * POS_FORMAT_MASK: The mask words and then the sample, no bit set past the sample
+def _csv_layouts(arr):
+  cols = arr.shape[1]
+  layouts = []
+  half_binary = cols % 2 == 0 and cols > 0 and bool(np.all(arr[:, :cols//2] <= 1))
+  if not half_binary:
+    layouts.append((None, cols))
+  elif np.any(arr[:, cols//2:] > 1):
+    layouts.append((POS_FORMAT_COLUMNS, cols//2))
+  sample_cols = _mask_sample_cols(cols)
+  if sample_cols is not None:
+    words = cols - sample_cols
+    last_bits = sample_cols - (words - 1)*WORD_BITS
+    if last_bits == WORD_BITS or np.all(arr[:, words - 1].view(np.uint64) >> np.uint64(last_bits) == 0):
+      layouts.append((POS_FORMAT_MASK, sample_cols))
+  return layouts
+
+# Read a CSV data file, compressed or not (see COMPRESSION_EXTENSIONS)
+# The layout of the columns is not written in the file, so it is worked out
+# from them (see _csv_layouts) and raises ValueError unless exactly one layout fits:
+# pos_format: None for any, POS_FORMAT_COLUMNS for the '0'/'1' position index
+#             columns (--with_pos) or none, POS_FORMAT_MASK for the position
+#             mask words (serial_hunter_mask.py)
+# single_sample_size: Numbers in each sample, if known, e.g., from the manifest
+# Returns (pos_index_arr, sample_arr), pos_index_arr being None if the file has
+# no position index
+def read_csv_samples(filename, pos_format=None, single_sample_size=None):
+  if pos_format is not None and pos_format not in POS_FORMATS:
+    raise ValueError("pos_format: %s must be one of %s" % (pos_format, POS_FORMATS))
+  arr = parse_csv_numbers(read_csv_bytes(filename))
+  all_layouts = _csv_layouts(arr)
+  allowed = {None: (None, POS_FORMAT_COLUMNS, POS_FORMAT_MASK), POS_FORMAT_COLUMNS: (None, POS_FORMAT_COLUMNS), POS_FORMAT_MASK: (POS_FORMAT_MASK,)}[pos_format]
+  layouts = [(layout_format, sample_cols) for layout_format, sample_cols in all_layouts
+             if layout_format in allowed and single_sample_size in (None, sample_cols)]
+  if len(layouts) != 1:
+    found = ", ".join("%d numbers with %s" % (sample_cols, layout_format or "no position index") for layout_format, sample_cols in all_layouts) or "none"
+    raise ValueError("%s: %d columns fit %s for pos_format: %s and single_sample_size: %s (the columns can be: %s), give the pos_format or single_sample_size of the file" % (
+      filename, arr.shape[1], "no layout" if not layouts else "more than one layout", pos_format, single_sample_size, found))
+  layout_format, sample_cols = layouts[0]
+  words = arr.shape[1] - sample_cols
+  if layout_format == POS_FORMAT_MASK:
+    return PositionMask(np.ascontiguousarray(arr[:, :words]).view(np.uint64), sample_cols).pos_index_arr(), arr[:, words:]
+  if layout_format == POS_FORMAT_COLUMNS:
+    return arr[:, :words].astype(np.uint8), arr[:, words:]
+  return None, arr
+
+# ASCII text of 0 to 9999, 4 digits each (with leading zeros) as one uint32
+_DIGITS_4 = np.arange(10000)
+_DIGITS_4_TEXT = (np.uint8(ord('0')) + (_DIGITS_4[:, None] // 10**np.arange(3, -1, -1)) % 10).astype(np.uint8).view('<u4').ravel()
+_PAD = 0
+
+def _number_widths(arr):
+  return np.maximum(np.searchsorted(POW10, arr, side='right'), 1)
+
+# The number_width right-most digits of every number as ASCII, (arr.shape, number_width) uint8
+def _format_digits(arr, number_width):
+  groups = -(-number_width // 4)
+  group_arr = np.empty(arr.shape + (groups,), dtype=np.uint64)
+  rest = arr
+  for group in range(groups - 1, 0, -1):
+    rest, group_arr[..., group] = np.divmod(rest, np.uint64(10000))
+  group_arr[..., 0] = rest % np.uint64(10000)
+  text = _DIGITS_4_TEXT[group_arr].view(np.uint8).reshape(arr.shape + (4*groups,))
+  return text[..., 4*groups - number_width:]
+
+def _to_uint64(arr):
+  arr = np.asarray(arr)
+  if arr.ndim != 2 or (arr.size and arr.dtype.kind not in 'iu'):
+    raise ValueError("Only 2-D matrices of integers are supported")
+  if arr.dtype.kind == 'i' and arr.size and arr.min() < 0:
+    raise ValueError("Only non-negative integers are supported")
+  return arr.astype(np.uint64, copy=False)
+
+# Format a (rows, cols) matrix of non-negative integers as the CSV bytes
+# csv.writer writes for arr.tolist()
+# arr can also be a list of matrices with the same rows, written one after
+# the other in each row, e.g., [position mask words (uint64), sample_arr (int64)]
+# Each column is formatted as wide as its largest number, the leading digits
+# of the smaller numbers are then dropped, which is skipped when all the
+# numbers of the columns have the same width, as in the data files
+def format_csv_rows(arr):
+  blocks = [_to_uint64(block) for block in (arr if isinstance(arr, (list, tuple)) else [arr])]
+  if len(set(len(block) for block in blocks)) != 1:
+    raise ValueError("The matrices must all have the same rows")
+  arr = blocks[0] if len(blocks) == 1 else np.hstack(blocks)
+  rows, cols = arr.shape
+  if rows == 0 or cols == 0:
+    return b'\r\n'*rows
+  col_widths = _number_widths(arr.max(axis=0))
+  # Where each column starts in the line, then its separator, ',' or '\r\n'
+  starts = np.concatenate([[0], np.cumsum(col_widths + 1)[:-1]])
+  lines = np.empty((rows, int(starts[-1] + col_widths[-1]) + 2), dtype=np.uint8)
+  lines[:, starts[1:] - 1] = ord(',')
+  lines[:, -2:] = (ord('\r'), ord('\n'))
+  # Runs of next to each other columns of the same width are evenly spaced in
+  # the line, so they are written through one (rows, run, width + 1) view
+  run_starts = np.flatnonzero(np.append(True, np.diff(col_widths) != 0))
+  for first, last in zip(run_starts.tolist(), np.append(run_starts[1:], cols).tolist()):
+    number_width = int(col_widths[first])
+    run_lines = lines[:, starts[first]:starts[first] + (last - first)*(number_width + 1)]
+    run_lines.reshape(rows, last - first, number_width + 1)[..., :number_width] = _format_digits(arr[:, first:last], number_width)
+  short_cols = np.flatnonzero(_number_widths(arr.min(axis=0)) < col_widths)
+  if len(short_cols) == 0:
+    count('format', lines.nbytes)
+    return lines.tobytes()
+  # Blank out the leading zeros of the numbers narrower than their column
+  widths = _number_widths(arr[:, short_cols])
+  for i, (col, col_width) in enumerate(zip(short_cols.tolist(), col_widths[short_cols].tolist())):
+    pad = np.arange(col_width) < (col_width - widths[:, i, None])
+    lines[:, starts[col]:starts[col] + col_width][pad] = _PAD
+  data = lines[lines != _PAD].tobytes()
+  count('format', len(data))
+  return data
+
+COMPRESSION_GZIP = 'gzip'
+COMPRESSION_ZSTD = 'zstd'
+COMPRESSIONS = [COMPRESSION_GZIP, COMPRESSION_ZSTD]
+COMPRESSION_EXTENSIONS = {COMPRESSION_GZIP: '.gz', COMPRESSION_ZSTD: '.zst'}
+# Compression level, gzip 1 to 9 and zstd 1 to 22, fast rather than small as
+# the files are generated far more often than they are stored
+COMPRESSION_LEVEL = 3
+# Formatted blocks waiting to be written, bounds the memory if the rows are
+# formatted faster than they are compressed
+WRITE_QUEUE_BLOCKS = 4
+
+def _import_zstandard():
+  # Imported here, zstandard is only needed for .zst files
+  try:
+    import zstandard
+  except ImportError:
+    raise ImportError("The zstandard package is needed for %s compression (pip install zstandard)" % COMPRESSION_ZSTD)
+  return zstandard
+
+# The compression of a file from its extension, or None if it is not compressed
+def filename_compression(filename):
+  extension = os.path.splitext(filename)[1]
+  for compression, compression_extension in COMPRESSION_EXTENSIONS.items():
+    if extension == compression_extension:
+      return compression
+  return None
+
+# The filename without its compression extension, e.g., to look it up in the manifest
+def strip_compression_extension(filename):
+  return os.path.splitext(filename)[0] if filename_compression(filename) else filename
+
+def read_csv_bytes(filename):
+  compression = filename_compression(filename)
+  if compression == COMPRESSION_GZIP:
+    with gzip.open(filename, mode='rb') as csv_file:
+      return csv_file.read()
+  with open(filename, mode='rb') as csv_file:
+    if compression == COMPRESSION_ZSTD:
+      return _import_zstandard().ZstdDecompressor().stream_reader(csv_file).read()
+    return csv_file.read()
+
+# compress(data) and flush() of the compression
+def _compressor(compression, level):
+  if compression == COMPRESSION_GZIP:
+    return zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+  if compression == COMPRESSION_ZSTD:
+    return _import_zstandard().ZstdCompressor(level=level).compressobj()
+  raise ValueError("compression: %s must be one of %s" % (compression, COMPRESSIONS))
+
+# Writes the blocks of a CSV file from a background thread
+#
+#   with CSVWriter(filename, compression=COMPRESSION_GZIP) as writer:
+#     for sample_arr in batches:
+#       writer.write_rows(sample_arr)
+#
+# write_rows formats the rows in the calling thread and queues the bytes, the
+# thread compresses them (zlib and zstandard let go of the GIL while they do)
+# and writes them. An error in the thread is raised by the next write or close
+class CSVWriter:
+  # compression: None, or one of COMPRESSIONS
+  # profiler: A serial_hunter_profile.Profiler to record the compress and disk_write stages of the thread in
+  def __init__(self, filename, compression=None, level=COMPRESSION_LEVEL, queue_blocks=WRITE_QUEUE_BLOCKS, profiler=None):
+    self.filename = filename
+    self.profiler = profiler
+    self.compressor = _compressor(compression, level) if compression else None
+    self.blocks = queue.Queue(queue_blocks)
+    self.error = None
+    self.csv_file = open(filename, mode='wb')
+    self.thread = threading.Thread(target=self._write_blocks, name='CSVWriter: %s' % filename, daemon=True)
+    self.thread.start()
+
+  def _write_blocks(self):
+    while True:
+      data = self.blocks.get()
+      if data is None:
+        break
+      if self.error is not None:
+        continue
+      try:
+        if self.compressor:
+          with self._stage('compress'):
+            data = self.compressor.compress(data)
+        with self._stage('disk_write'):
+          self.csv_file.write(data)
+        if self.profiler:
+          self.profiler.count('disk_write', len(data))
+      except Exception as e:
+        self.error = e
+    try:
+      if self.error is None and self.compressor:
+        self.csv_file.write(self.compressor.flush())
+    except Exception as e:
+      self.error = e
+    finally:
+      self.csv_file.close()
+
+  def _stage(self, name):
+    return self.profiler.stage(name, allocations=False) if self.profiler else NULL_STAGE
+
+  def _raise_error(self):
+    if self.error is not None:
+      raise OSError("Writing %s failed: %s" % (self.filename, self.error)) from self.error
+
+  # Write already formatted CSV bytes, e.g., a shard written by another process
+  def write(self, data):
+    self._raise_error()
+    if self.thread is None:
+      raise ValueError("%s is closed" % self.filename)
+    if len(data):
+      self.blocks.put(data)
+
+  def write_rows(self, arr):
+    self.write(format_csv_rows(arr))
+
+  # Waits for all the blocks to be written
+  def close(self):
+    if self.thread is not None:
+      self.blocks.put(None)
+      self.thread.join()
+      self.thread = None
+    self._raise_error()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.close()
@@ -0,0 +1,141 @@
+# Exact serial sequence detector
+#
+# A sequence is a chain of numbers in the sample where, once the numbers are
+# sorted, every number is within THRESHOLD_GAP of the previous one (see
+# find_largest_distance_between_first_and_last_in_seq). Where the numbers are in
+# the sample does not matter, so out-of-order sequences are found too.
+# Repeated numbers neither break a chain nor count twice in it.
+#
+# A sample has a serial sequence if it has a chain of at least
+# THRESHOLD_SEQUENCE numbers, which is what the data files are labelled with
+# (the sequence rows are made by generate_seq(THRESHOLD_SEQUENCE, ...))
+#
+# Each sample is sorted once and then scanned linearly, i.e., O(n log n), and
+# all the samples (rows) of a matrix are processed together
+
+import numpy as np
+
+from serial_hunter_config import NUMBER_SIZE, THRESHOLD_GAP, THRESHOLD_SEQUENCE
+
+# Sort every row and measure the chains
+# sample_arr: (rows, cols) numbers
+# Returns (order, lengths, starts), all (rows, cols)
+# * order: argsort of each row, i.e., the column of each sorted number
+# * lengths: Distinct numbers in the chain that ends at this sorted number
+# * starts: Sorted position where the chain that ends at this sorted number starts
+def sorted_chains(sample_arr, max_gap=THRESHOLD_GAP):
+  sample_arr = np.atleast_2d(np.asarray(sample_arr, dtype=np.int64))
+  rows, cols = sample_arr.shape
+  order = np.argsort(sample_arr, axis=1, kind='stable')
+  sorted_arr = np.take_along_axis(sample_arr, order, axis=1)
+  gaps = np.diff(sorted_arr, axis=1)
+  linked = gaps <= max_gap
+  # Distinct numbers seen so far, minus the count at the latest chain break
+  distinct = np.cumsum(linked & (gaps > 0), axis=1)
+  distinct_at_break = np.maximum.accumulate(np.where(linked, 0, distinct), axis=1)
+  lengths = np.ones((rows, cols), dtype=np.int64)
+  lengths[:, 1:] += distinct - distinct_at_break
+  starts = np.zeros((rows, cols), dtype=np.int64)
+  starts[:, 1:] = np.maximum.accumulate(np.where(linked, 0, np.arange(1, cols)), axis=1)
+  return order, lengths, starts
+
+# Returns (rows,) the length of the longest chain in each sample
+def longest_sequence_batch(sample_arr, max_gap=THRESHOLD_GAP):
+  _, lengths, _ = sorted_chains(sample_arr, max_gap)
+  return lengths.max(axis=1) if lengths.shape[1] else np.zeros(lengths.shape[0], dtype=np.int64)
+
+# Returns (rows,) True for the samples with a serial sequence
+def has_sequence_batch(sample_arr, max_gap=THRESHOLD_GAP, threshold_sequence=THRESHOLD_SEQUENCE):
+  return longest_sequence_batch(sample_arr, max_gap) >= threshold_sequence
+
+# Find every serial sequence in every sample
+# Returns a list with, for each row, a list of sequences, each being the array
+# of the columns of its numbers in increasing number order
+def find_sequences_batch(sample_arr, max_gap=THRESHOLD_GAP, threshold_sequence=THRESHOLD_SEQUENCE):
+  order, lengths, starts = sorted_chains(sample_arr, max_gap)
+  rows, cols = lengths.shape
+  # A chain ends where the next sorted number is not linked to it
+  chain_end = np.ones((rows, cols), dtype=bool)
+  chain_end[:, :-1] = starts[:, 1:] != starts[:, :-1]
+  sequences = [[] for _ in range(rows)]
+  for row, end in zip(*np.nonzero(chain_end & (lengths >= threshold_sequence))):
+    sequences[row].append(order[row, starts[row, end]:end+1])
+  return sequences
+
+# Same as find_sequences_batch for a single sample, e.g., a BATCH_NUMBER_COUNT batch
+# Returns a list of sequences, each being the list of the indexes of its numbers
+def find_sequences(numbers, max_gap=THRESHOLD_GAP, threshold_sequence=THRESHOLD_SEQUENCE):
+  return [seq.tolist() for seq in find_sequences_batch([numbers], max_gap, threshold_sequence)[0]]
+
+# Mid-position sequences
+#
+# generate_seq_with_pos_index makes sequences that increment seq_pos digits
+# from the right, the seq_pos right-most digits (suffix) being random but the
+# same for the whole sequence, e.g., 104233, 104333, 104433 for seq_pos 2. The
+# numbers then differ by multiples of 10**seq_pos, so the plain check above
+# does not see them
+#
+# For a seq_pos, the numbers with the same suffix are grouped and chained by
+# what is left of them, the head (number // 10**seq_pos). Both are packed into
+# one key, suffix*(10**(number_size - seq_pos) + max_gap + 1) + head, so that
+# the heads of different suffixes are never within max_gap, and the keys of
+# all the positions of all the samples are sorted and scanned as one matrix
+
+# Returns (len(positions), rows, cols) the key of every number for every seq_pos
+# The numbers must have at most number_size digits
+def seq_pos_keys(sample_arr, positions=None, max_gap=THRESHOLD_GAP, number_size=NUMBER_SIZE):
+  sample_arr = np.atleast_2d(np.asarray(sample_arr, dtype=np.int64))
+  positions = np.arange(number_size) if positions is None else np.asarray(positions, dtype=np.int64)
+  scales = (10**positions)[:, None, None]
+  head_spans = (10**(number_size - positions) + max_gap + 1)[:, None, None]
+  return (sample_arr % scales)*head_spans + sample_arr // scales
+
+# Returns (rows, len(positions)) the length of the longest chain in each sample for each seq_pos
+# positions: The seq_pos to check, all of 0..number_size-1 by default
+# All the positions are kept in memory at once, so split very large matrices into chunks
+def longest_sequence_by_pos_batch(sample_arr, positions=None, max_gap=THRESHOLD_GAP, number_size=NUMBER_SIZE):
+  keys = seq_pos_keys(sample_arr, positions, max_gap, number_size)
+  npos, rows, cols = keys.shape
+  return longest_sequence_batch(keys.reshape(npos*rows, cols), max_gap).reshape(npos, rows).T
+
+# Returns (rows,) True for the samples that have, for some seq_pos, two
+# numbers with the same suffix and heads within max_gap, i.e., the only samples
+# that can have a mid-position sequence
+# Unlike seq_pos_keys, one seq_pos at a time and without keeping the keys, so
+# it is cheap enough to run on every sample
+def _seq_pos_candidates(sample_arr, positions, max_gap, number_size):
+  rows, cols = sample_arr.shape
+  candidates = np.zeros(rows, dtype=bool)
+  if cols < 2:
+    return candidates
+  gaps = np.empty((rows, cols - 1), dtype=np.int64)
+  for seq_pos in positions.tolist():
+    heads, keys = np.divmod(sample_arr, 10**seq_pos)
+    keys *= 10**(number_size - seq_pos) + max_gap + 1
+    keys += heads
+    keys.sort(axis=1)
+    np.subtract(keys[:, 1:], keys[:, :-1], out=gaps)
+    candidates |= gaps.min(axis=1) <= max_gap
+  return candidates
+
+# Returns (rows,) the seq_pos of the longest chain in each sample (the lowest
+# one if tied), or -1 for the samples without a serial sequence at any seq_pos
+# Only the samples that pass the cheap _seq_pos_candidates check are measured
+def find_seq_pos_batch(sample_arr, positions=None, max_gap=THRESHOLD_GAP, threshold_sequence=THRESHOLD_SEQUENCE, number_size=NUMBER_SIZE):
+  sample_arr = np.atleast_2d(np.asarray(sample_arr, dtype=np.int64))
+  positions = np.arange(number_size) if positions is None else np.asarray(positions, dtype=np.int64)
+  seq_pos = np.full(sample_arr.shape[0], -1, dtype=np.int64)
+  if threshold_sequence <= 1:
+    candidates = np.arange(sample_arr.shape[0])
+  else:
+    candidates = np.flatnonzero(_seq_pos_candidates(sample_arr, positions, max_gap, number_size))
+  if len(candidates) == 0:
+    return seq_pos
+  lengths = longest_sequence_by_pos_batch(sample_arr[candidates], positions, max_gap, number_size)
+  best = lengths.argmax(axis=1)
+  seq_pos[candidates] = np.where(lengths.max(axis=1) >= threshold_sequence, positions[best], -1)
+  return seq_pos
+
+# Returns (rows,) True for the samples with a serial sequence at any seq_pos
+def has_sequence_any_pos_batch(sample_arr, positions=None, max_gap=THRESHOLD_GAP, threshold_sequence=THRESHOLD_SEQUENCE, number_size=NUMBER_SIZE):
+  return find_seq_pos_batch(sample_arr, positions, max_gap, threshold_sequence, number_size) >= 0
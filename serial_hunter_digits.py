@@ -0,0 +1,67 @@
+# Digit tensors, i.e., the CNN input
+#
+# The notebooks turn each sample into the model input by joining the numbers
+# into one digit string and splitting it into characters
+# (create_single_sample_from_array), then reshape to (rows, 1, cols*NUMBER_SIZE, 1)
+# and pair it with the one-hot CLASSES outcome
+#
+# This does the same with integer arithmetic on whole matrices, and writes the
+# result as .npy files that can be loaded (or memory mapped) straight into fit()
+# * <name>.npy: X, (rows, 1, cols*NUMBER_SIZE, 1) uint8 digits
+# * <name>_labels.npy: Y, (rows, len(CLASSES)) uint8 one-hot outcome
+
+import os
+
+import numpy as np
+
+from serial_hunter_config import CLASSES, NUMBER_SIZE
+
+ONE_HOT_CLASSES = np.array(list(CLASSES.values()), dtype=np.uint8)
+
+# Split every number into its number_size digits, most significant first
+# sample_arr: (rows, cols) numbers
+# Returns (rows, cols*number_size) uint8
+def numbers_to_digits(sample_arr, number_size=NUMBER_SIZE):
+  sample_arr = np.asarray(sample_arr, dtype=np.int64)
+  powers = 10**np.arange(number_size-1, -1, -1, dtype=np.int64)
+  digits = (sample_arr[..., None] // powers) % 10
+  return digits.astype(np.uint8).reshape(sample_arr.shape[:-1] + (sample_arr.shape[-1]*number_size,))
+
+# The inverse of numbers_to_digits
+# digits: (rows, cols*number_size), or any shape holding rows of that many digits
+# Returns (rows, cols) int64
+def digits_to_numbers(digits, number_size=NUMBER_SIZE):
+  digits = np.asarray(digits).reshape(len(digits), -1, number_size)
+  return digits.astype(np.int64) @ 10**np.arange(number_size - 1, -1, -1, dtype=np.int64)
+
+# Same as numbers_to_digits but shaped as the CNN input, (rows, 1, cols*number_size, 1)
+def numbers_to_digit_tensor(sample_arr, number_size=NUMBER_SIZE):
+  digits = numbers_to_digits(sample_arr, number_size)
+  return digits.reshape(digits.shape[0], 1, digits.shape[1], 1)
+
+# labels: Class index (in CLASSES) of each row
+def labels_to_one_hot(labels):
+  return ONE_HOT_CLASSES[np.asarray(labels)]
+
+def labels_filename(filename):
+  return os.path.splitext(filename)[0] + '_labels.npy'
+
+# Create both .npy files sized for rows samples of cols numbers
+def create_digit_dataset(filename, rows, cols, number_size=NUMBER_SIZE):
+  np.lib.format.open_memmap(filename, mode='w+', dtype=np.uint8, shape=(rows, 1, cols*number_size, 1)).flush()
+  np.lib.format.open_memmap(labels_filename(filename), mode='w+', dtype=np.uint8, shape=(rows, len(CLASSES))).flush()
+
+# Memory map both .npy files
+# Returns (X, Y)
+def open_digit_dataset(filename, mode='r'):
+  return np.load(filename, mmap_mode=mode), np.load(labels_filename(filename), mmap_mode=mode)
+
+# Write the rows [start, start + len(sample_arr)) of a file made by create_digit_dataset
+# labels: Class index of each row
+def write_digit_rows(filename, start, sample_arr, labels, number_size=NUMBER_SIZE):
+  x, y = open_digit_dataset(filename, mode='r+')
+  end = start + len(sample_arr)
+  x[start:end] = numbers_to_digit_tensor(sample_arr, number_size)
+  y[start:end] = labels_to_one_hot(labels)
+  x.flush()
+  y.flush()
@@ -0,0 +1,299 @@
+# Infinite training feed, straight from the generators to fit()
+#
+# Instead of writing the data files and loading them back, FeedIterator
+# generates the batches as they are needed: every batch holds batch_size
+# samples of the CLASSES in the given ratios, as the CNN input and one-hot
+# outcome (X, Y), the same as the digits files (serial_hunter_digits.py):
+# * X: (batch_size, 1, single_sample_size*NUMBER_SIZE, 1) uint8 digits
+# * Y: (batch_size, len(CLASSES)) uint8 one-hot outcome
+#
+# The batches are generated by workers background processes, each keeping up
+# to prefetch batches ready in its own bounded queue, so the training step
+# only waits for data if the workers together are slower than it (wait_seconds
+# tells how long it did). Nothing is written to disk. The first batch is
+# generated upfront, so bad ratios, parts or sizes raise in the constructor,
+# and a worker that fails later raises its exception in the consumer
+#
+# Batch i is generated from its own random streams (seed, class, row), see
+# serial_hunter_rng.py, so the batches only depend on the seed, NOT on the
+# number of workers, and any batch can be generated again on its own
+# (generate_feed_batch). The rows of a batch hold the classes in a random order
+#
+# Each class can mix several parts, e.g., the in order, mid and ooo parts the
+# data files (and the checked in model) are made of: every row of the class
+# picks one from its own stream, in proportion to their weights.
+# feed_parts_from_jobs takes the mix from data file jobs:
+#
+#   parts = feed_parts_from_jobs(plan_jobs(load_manifest(), only=['data_no_sequence_10000_*', 'data_sequence_*_10000_*']))
+#   with FeedIterator(parts=parts) as feed:
+#
+#   with FeedIterator(batch_size=64, ratios={'none': 2, 'sparse': 1, 'head-heavy': 1, 'tail-heavy': 1}) as feed:
+#     model.fit(feed, steps_per_epoch=1000, epochs=10)
+#
+# FeedIterator is an iterator with a single consumer, which fit() takes as is
+# (with steps_per_epoch). For Keras versions (or workers / use_multiprocessing
+# in fit) that need a keras.utils.Sequence, see keras_sequence
+
+import argparse
+import multiprocessing
+import queue
+import time
+
+import numpy as np
+
+from serial_hunter_batch import generate_samples_batch, PLACEMENT_SPARSE, PLACEMENT_HEAD_HEAVY, PLACEMENT_TAIL_HEAVY
+from serial_hunter_config import CLASSES, MIN_NUMBER, MAX_NUMBER, SINGLE_SAMPLE_SIZE_50
+from serial_hunter_digits import labels_to_one_hot, numbers_to_digit_tensor
+from serial_hunter_pool import make_part
+from serial_hunter_rng import RowRNG, stream_key
+
+CLASS_NAMES = list(CLASSES.keys())
+
+BATCH_SIZE = 32
+WORKERS = 2
+# Batches each worker keeps ready
+PREFETCH = 4
+# Batches in an epoch of keras_sequence
+STEPS_PER_EPOCH = 1000
+# How often the consumer checks that the worker it waits for is still running
+WORKER_POLL_SECONDS = 1.0
+FEED_STREAM = 'serial_hunter_feed'
+
+# How the samples of each class are generated, same as the data files, e.g.,
+# the no sequence samples hold one sequence element only
+# {class name: part} or {class name: [(part, weight), ...]}, see _class_mixes
+FEED_PARTS = {
+  'none': make_part('none', PLACEMENT_SPARSE, 0, seq_count=1),
+  'sparse': make_part('sparse', PLACEMENT_SPARSE, 0),
+  'head-heavy': make_part('head-heavy', PLACEMENT_HEAD_HEAVY, 0),
+  'tail-heavy': make_part('tail-heavy', PLACEMENT_TAIL_HEAVY, 0),
+}
+EQUAL_RATIOS = dict((class_name, 1) for class_name in CLASS_NAMES)
+
+# Returns the ratio of each class of CLASS_NAMES, normalized to add up to 1
+def _class_fractions(ratios):
+  unknown = set(ratios) - set(CLASS_NAMES)
+  if unknown:
+    raise ValueError("ratios: %s are not in CLASSES: %s" % (sorted(unknown), CLASS_NAMES))
+  weights = np.array([ratios.get(class_name, 0) for class_name in CLASS_NAMES], dtype=np.float64)
+  if np.any(weights < 0) or weights.sum() <= 0:
+    raise ValueError("ratios: %s must not be negative, and at least one must be positive" % ratios)
+  return weights / weights.sum()
+
+# parts: {class name: part, or [(part, weight), ...]}
+# Returns {class name: (parts, cumulative fractions of their weights)}
+def _class_mixes(parts):
+  mixes = {}
+  for class_name, class_parts in parts.items():
+    if class_name not in CLASS_NAMES:
+      raise ValueError("parts: %s is not in CLASSES: %s" % (class_name, CLASS_NAMES))
+    if isinstance(class_parts, dict):
+      class_parts = [(class_parts, 1)]
+    if not class_parts:
+      raise ValueError("parts: %s has no parts" % class_name)
+    for part, weight in class_parts:
+      if part['class'] != class_name:
+        raise ValueError("parts: a part of class %s is given for %s" % (part['class'], class_name))
+      if weight <= 0:
+        raise ValueError("parts: the weights of %s must be positive" % class_name)
+    weights = np.array([weight for _, weight in class_parts], dtype=np.float64)
+    bounds = np.cumsum(weights) / weights.sum()
+    bounds[-1] = 1
+    mixes[class_name] = ([part for part, _ in class_parts], bounds)
+  return mixes
+
+# The parts of the jobs' files as feed parts, each part weighted by its rows,
+# so the feed holds the same mix of parts within each class as the files
+def feed_parts_from_jobs(jobs):
+  parts = {}
+  for job in jobs:
+    for part in job['parts']:
+      parts.setdefault(part['class'], []).append((part, part['rows']))
+  return parts
+
+# Class index (in CLASSES) of each row of batch batch_index
+# The first n rows of the feed hold floor(n*cumulative fraction) rows up to
+# each class, so the ratios hold over any number of batches, even when
+# batch_size*fraction is not a whole number
+def _batch_labels(batch_index, batch_size, fractions, seed, stream):
+  bounds = np.cumsum(fractions)
+  bounds[-1] = 1
+  start, end = batch_index*batch_size, (batch_index + 1)*batch_size
+  counts = np.diff(np.floor(end*bounds).astype(np.int64), prepend=0) - np.diff(np.floor(start*bounds).astype(np.int64), prepend=0)
+  labels = np.repeat(np.arange(len(CLASS_NAMES), dtype=np.uint8), counts)
+  # The order of the rows has its own stream, one row of it per batch
+  return RowRNG(stream_key(seed, stream + '/order'), [batch_index]).permuted(labels[None, :], axis=1)[0]
+
+# Generate batch batch_index of the feed
+# ratios: {class name: ratio}, the classes that are not given get none
+# parts: {class name: part (make_part), or [(part, weight), ...]}, how to
+#        generate the samples of each class, FEED_PARTS by default
+# Returns (X, Y)
+def generate_feed_batch(batch_index, seed, batch_size=BATCH_SIZE, ratios=EQUAL_RATIOS, single_sample_size=SINGLE_SAMPLE_SIZE_50, parts=None, stream=FEED_STREAM):
+  mixes = _class_mixes(parts or FEED_PARTS)
+  labels = _batch_labels(batch_index, batch_size, _class_fractions(ratios), seed, stream)
+  rows = batch_index*batch_size + np.arange(batch_size, dtype=np.int64)
+  sample_arr = np.empty((batch_size, single_sample_size), dtype=np.int64)
+  for class_index in np.unique(labels):
+    class_name = CLASS_NAMES[class_index]
+    if class_name not in mixes:
+      raise ValueError("ratios: %s has rows, but no parts" % class_name)
+    class_parts, bounds = mixes[class_name]
+    class_rows = np.flatnonzero(labels == class_index)
+    # Streams per class (and part), so the samples of a row do not depend on the ratios
+    class_stream = '%s/%s' % (stream, class_name)
+    unit = RowRNG(stream_key(seed, class_stream + '/part'), rows[class_rows]).integers(0, 2**53, size=(len(class_rows),)) * 2.0**-53
+    row_parts = np.searchsorted(bounds, unit, side='right')
+    for part_index in np.unique(row_parts):
+      part = class_parts[part_index]
+      part_rows = class_rows[row_parts == part_index]
+      rng = RowRNG(stream_key(seed, '%s/%d' % (class_stream, part_index)), rows[part_rows])
+      sample_arr[part_rows], _ = generate_samples_batch(len(part_rows), part['placement'], part['seq_count'], MIN_NUMBER, MAX_NUMBER, seq_pos=part['seq_pos'], min_gap=part['min_gap'], max_gap=part['max_gap'], in_order=part['in_order'], single_sample_size=single_sample_size, start_pct=part['start_pct'], end_pct=part['end_pct'], rng=rng)
+  return numbers_to_digit_tensor(sample_arr), labels_to_one_hot(labels)
+
+# Worker process: generate the batches first, first + step, ... into batch_queue, until terminated
+# Puts (batch, None), or (None, exception) and stops if generating a batch fails
+def _feed_worker(batch_queue, first, step, feed_args):
+  batch_index = first
+  while True:
+    try:
+      batch = generate_feed_batch(batch_index, *feed_args)
+    except Exception as e:
+      batch_queue.put((None, e))
+      return
+    # put blocks while the queue is full, which bounds the prefetch
+    batch_queue.put((batch, None))
+    batch_index += step
+
+class FeedIterator:
+  # seed: Seed for the random streams, a random one if None (see self.seed)
+  # workers: Background processes generating the batches, 0 to generate them
+  #          in the calling process when they are asked for
+  # prefetch: Batches each worker keeps ready
+  # steps_per_epoch: Batches in an epoch of keras_sequence, the feed itself never ends
+  # See generate_feed_batch for the others
+  def __init__(self, batch_size=BATCH_SIZE, ratios=EQUAL_RATIOS, single_sample_size=SINGLE_SAMPLE_SIZE_50, parts=None, seed=None, workers=WORKERS, prefetch=PREFETCH, steps_per_epoch=STEPS_PER_EPOCH, stream=FEED_STREAM):
+    self.seed = np.random.SeedSequence().entropy if seed is None else seed
+    self.feed_args = (self.seed, batch_size, ratios, single_sample_size, parts, stream)
+    self.workers = workers
+    self.steps_per_epoch = steps_per_epoch
+    # Generated here, so whatever the workers would fail on raises now
+    self.first_batch = generate_feed_batch(0, *self.feed_args)
+    # Index of the next batch
+    self.batch_index = 0
+    # Time spent waiting for the workers
+    self.wait_seconds = 0.0
+    self.closed = False
+    # Worker i generates the batches 1 + i, 1 + i + workers, ..., so taking
+    # them from the queues in turn gives the batches in order
+    self.queues = [multiprocessing.Queue(maxsize=max(prefetch, 1)) for _ in range(workers)]
+    self.processes = [multiprocessing.Process(target=_feed_worker, args=(batch_queue, 1 + i, workers, self.feed_args), daemon=True) for i, batch_queue in enumerate(self.queues)]
+    for process in self.processes:
+      process.start()
+
+  def __iter__(self):
+    return self
+
+  def __next__(self):
+    if self.closed:
+      raise RuntimeError("The feed is closed")
+    if self.batch_index == 0:
+      batch = self.first_batch
+      self.first_batch = None
+    elif not self.workers:
+      batch = generate_feed_batch(self.batch_index, *self.feed_args)
+    else:
+      start = time.perf_counter()
+      batch = self._get((self.batch_index - 1) % self.workers)
+      self.wait_seconds += time.perf_counter() - start
+    self.batch_index += 1
+    return batch
+
+  # The next batch of worker i, raises what the worker failed with, or
+  # RuntimeError if it is gone without a word, instead of waiting forever
+  def _get(self, i):
+    while True:
+      try:
+        batch, error = self.queues[i].get(timeout=WORKER_POLL_SECONDS)
+        break
+      except queue.Empty:
+        if not self.processes or not self.processes[i].is_alive():
+          raise RuntimeError("Feed worker %d is not running (exit code: %s)" % (i, self.processes[i].exitcode if self.processes else None))
+    if error is not None:
+      raise error
+    return batch
+
+  def close(self):
+    self.closed = True
+    for process in self.processes:
+      process.terminate()
+    for process in self.processes:
+      process.join()
+    for batch_queue in self.queues:
+      # Do not wait to flush batches nobody will read
+      batch_queue.cancel_join_thread()
+      batch_queue.close()
+    self.processes = []
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.close()
+
+# A keras.utils.Sequence of the same batches as a FeedIterator, for the Keras
+# versions that only take a Sequence (needs TensorFlow)
+# Item index of epoch e is batch e*steps_per_epoch + index, generated by
+# whichever process asks for it (the Keras workers with workers / use_multiprocessing),
+# so the feed's own workers are not used, give it workers=0
+def keras_sequence(feed):
+  # Imported here, TensorFlow is only needed for training
+  try:
+    from tensorflow.keras.utils import Sequence
+  except ImportError:
+    raise ImportError("keras_sequence needs TensorFlow (pip install tensorflow), FeedIterator can be passed to fit() as is")
+
+  class FeedSequence(Sequence):
+    def __init__(self):
+      super().__init__()
+      self.feed_args = feed.feed_args
+      self.steps_per_epoch = feed.steps_per_epoch
+      self.epoch = 0
+
+    def __len__(self):
+      return self.steps_per_epoch
+
+    def __getitem__(self, index):
+      if not 0 <= index < self.steps_per_epoch:
+        raise IndexError("index: %d is not in [0, %d)" % (index, self.steps_per_epoch))
+      return generate_feed_batch(self.epoch*self.steps_per_epoch + index, *self.feed_args)
+
+    # Every epoch gets new batches
+    def on_epoch_end(self):
+      self.epoch += 1
+
+  return FeedSequence()
+
+# Measure how fast the feed is, and how long a consumer taking step_ms per batch waits for it
+def main(argv=None):
+  parser = argparse.ArgumentParser()
+  parser.add_argument("--batches", type=int, default=500)
+  parser.add_argument("--batch_size", type=int, default=BATCH_SIZE)
+  parser.add_argument("--single_sample_size", type=int, default=SINGLE_SAMPLE_SIZE_50)
+  parser.add_argument("--workers", type=int, default=WORKERS)
+  parser.add_argument("--prefetch", type=int, default=PREFETCH)
+  parser.add_argument("--step_ms", help="Time the consumer spends on each batch, i.e., the training step", type=float, default=0)
+  parser.add_argument("--seed", type=int, default=None)
+  args = parser.parse_args(argv)
+
+  with FeedIterator(args.batch_size, single_sample_size=args.single_sample_size, seed=args.seed, workers=args.workers, prefetch=args.prefetch) as feed:
+    start = time.perf_counter()
+    for _ in range(args.batches):
+      next(feed)
+      if args.step_ms:
+        time.sleep(args.step_ms / 1000.0)
+    elapsed = time.perf_counter() - start
+  print("%d batches of %d in %.2fs: %.0f samples/s, waited %.2fs for the workers" % (args.batches, args.batch_size, elapsed, args.batches*args.batch_size/elapsed, feed.wait_seconds))
+
+if __name__ == "__main__":
+  main()
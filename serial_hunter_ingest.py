@@ -0,0 +1,290 @@
+# Ingest the numbers from a database into the detector or the CNN
+#
+# A sample is the numbers pulled out during an SQL query (see
+# serial_hunter_data_gen.py): here the numbers of a table, in key order, are
+# cut into samples of single_sample_size numbers and scored a chunk of samples
+# at a time, e.g., with has_sequence_batch (serial_hunter_detector.py) or the
+# predict_samples of a model (serial_hunter_model.py)
+#
+# Works with any DB-API 2.0 driver (sqlite3, psycopg2, pymysql, ...):
+# * The connections come from a ConnectionPool, opened once and reused
+# * The numbers are read with fetchmany, fetch_rows rows at a time, and each
+#   batch of rows is turned into int64 arrays with np.fromiter straight from the
+#   row tuples, without a list of Python ints in between
+# * The key of the last number of the last scored sample is saved to the
+#   checkpoint file once the chunk is handled, so a run that stops picks up from
+#   there (the numbers of an incomplete sample are read again). The key column
+#   has to be an integer, e.g., an auto-increment id
+#
+#   pool = ConnectionPool(lambda: sqlite3.connect('numbers.db'))
+#   for sample_arr, scores, last_key in ingest(pool, checkpoint_filename='numbers.checkpoint.json'):
+#     alert(sample_arr[scores])
+#
+# create_sqlite_fixture writes a SQLite database of generated samples (half of
+# them with a sequence), to try it out and benchmark it offline:
+#
+#   python serial_hunter_ingest.py --create_fixture 1000000 numbers.db
+#   python serial_hunter_ingest.py numbers.db [--scorer model] [--checkpoint FILE]
+
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from serial_hunter_batch import PLACEMENT_SPARSE
+from serial_hunter_binary import CLASS_NAMES
+from serial_hunter_config import SINGLE_SAMPLE_SIZE_50
+from serial_hunter_detector import has_sequence_batch
+from serial_hunter_pool import generate_chunk, job_chunk_rows, make_job, make_part
+
+TABLE = 'numbers'
+KEY_COLUMN = 'id'
+NUMBER_COLUMN = 'number'
+# Rows read by each fetchmany
+FETCH_ROWS = 100000
+POOL_SIZE = 2
+FIXTURE_STREAM = 'serial_hunter_ingest_fixture'
+# One sample of each class in turn, i.e., half of them with a sequence
+FIXTURE_PARTS = [make_part('none', PLACEMENT_SPARSE, 0, seq_count=1), make_part('sparse', PLACEMENT_SPARSE, 0)]
+
+# The DB-API paramstyles, as (placeholder, parameters of last_key)
+PARAMSTYLES = {
+  'qmark': ('?', lambda last_key: (last_key,)),
+  'numeric': (':1', lambda last_key: (last_key,)),
+  'named': (':last_key', lambda last_key: {'last_key': last_key}),
+  'format': ('%s', lambda last_key: (last_key,)),
+  'pyformat': ('%(last_key)s', lambda last_key: {'last_key': last_key}),
+}
+
+class ConnectionPool:
+  # connect: Called with no arguments to open a connection, e.g., lambda: psycopg2.connect(dsn)
+  # size: Most connections open at the same time, connection() waits for one to
+  #       be returned when they are all in use
+  def __init__(self, connect, size=POOL_SIZE):
+    if size < 1:
+      raise ValueError("size: %d must be at least 1" % size)
+    self.connect = connect
+    self.size = size
+    self.idle = queue.LifoQueue()
+    # Connections open, idle or lent out
+    self.opened = 0
+    self.closed = False
+    self.lock = threading.Lock()
+
+  # Borrow a connection, returned to the pool at the end of the with block
+  # A connection whose block raised is closed instead, it may be broken, and so
+  # is one returned after the pool is closed
+  @contextlib.contextmanager
+  def connection(self):
+    with self.lock:
+      if self.closed:
+        raise RuntimeError("The connection pool is closed")
+      open_new = self.idle.empty() and self.opened < self.size
+      if open_new:
+        self.opened += 1
+    if open_new:
+      try:
+        connection = self.connect()
+      except BaseException:
+        with self.lock:
+          self.opened -= 1
+        raise
+    else:
+      connection = self.idle.get()
+    broken = False
+    try:
+      yield connection
+    except Exception:
+      broken = True
+      raise
+    finally:
+      # Also returned when a generator holding it is closed (GeneratorExit)
+      with self.lock:
+        keep = not broken and not self.closed
+        if keep:
+          self.idle.put(connection)
+        else:
+          self.opened -= 1
+      if not keep:
+        with contextlib.suppress(Exception):
+          connection.close()
+
+  # Close the idle connections, the ones lent out are closed when they are returned
+  def close(self):
+    with self.lock:
+      self.closed = True
+    while True:
+      try:
+        connection = self.idle.get_nowait()
+      except queue.Empty:
+        break
+      with self.lock:
+        self.opened -= 1
+      connection.close()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.close()
+
+# Returns the last key saved to the checkpoint file, or None if there is none
+def load_checkpoint(checkpoint_filename):
+  if not os.path.exists(checkpoint_filename):
+    return None
+  with open(checkpoint_filename) as checkpoint_file:
+    return json.load(checkpoint_file)['last_key']
+
+def save_checkpoint(checkpoint_filename, last_key):
+  with open(checkpoint_filename + '.tmp', mode='w') as checkpoint_file:
+    json.dump({'last_key': int(last_key)}, checkpoint_file)
+  os.replace(checkpoint_filename + '.tmp', checkpoint_filename)
+
+# The table and column names go into the SQL as they are, so they have to be
+# plain identifiers (a table can have a schema, e.g., audit.numbers)
+def _check_identifiers(table, key_column, number_column):
+  for what, name, parts in (('table', table, table.split('.', 1)), ('key_column', key_column, [key_column]), ('number_column', number_column, [number_column])):
+    if not all(part.isidentifier() for part in parts):
+      raise ValueError("%s: %r is not an identifier" % (what, name))
+
+# The query of the numbers after last_key (all of them if None), in key order
+# Returns (sql, parameters)
+def numbers_query(table=TABLE, key_column=KEY_COLUMN, number_column=NUMBER_COLUMN, last_key=None, paramstyle='qmark'):
+  _check_identifiers(table, key_column, number_column)
+  if paramstyle not in PARAMSTYLES:
+    raise ValueError("paramstyle: %s must be one of %s" % (paramstyle, list(PARAMSTYLES)))
+  if last_key is None:
+    return "SELECT %s, %s FROM %s ORDER BY %s" % (key_column, number_column, table, key_column), ()
+  placeholder, parameters = PARAMSTYLES[paramstyle]
+  return "SELECT %s, %s FROM %s WHERE %s > %s ORDER BY %s" % (key_column, number_column, table, key_column, placeholder, key_column), parameters(int(last_key))
+
+# Read the (key, number) rows of an executed cursor, fetch_rows at a time
+# Yields (keys, numbers), both int64
+def fetch_number_chunks(cursor, fetch_rows=FETCH_ROWS):
+  while True:
+    rows = cursor.fetchmany(fetch_rows)
+    if not rows:
+      return
+    pairs = np.fromiter(itertools.chain.from_iterable(rows), dtype=np.int64, count=2*len(rows))
+    yield pairs[0::2], pairs[1::2]
+
+# Read the numbers after last_key and cut them into samples of single_sample_size numbers
+# A sample never spans two chunks, the numbers left over at the end of a chunk
+# go to the next one, and those left over at the end of the table are not returned
+# Yields (sample_arr, last_key), sample_arr being (samples, single_sample_size)
+# int64 and last_key the key of its last number
+def ingest_samples(pool, table=TABLE, key_column=KEY_COLUMN, number_column=NUMBER_COLUMN, single_sample_size=SINGLE_SAMPLE_SIZE_50, fetch_rows=FETCH_ROWS, last_key=None, paramstyle='qmark'):
+  sql, parameters = numbers_query(table, key_column, number_column, last_key, paramstyle)
+  with pool.connection() as connection:
+    cursor = connection.cursor()
+    try:
+      cursor.execute(sql, parameters)
+      leftover_keys = leftover_numbers = np.empty(0, dtype=np.int64)
+      for keys, numbers in fetch_number_chunks(cursor, fetch_rows):
+        if len(leftover_numbers):
+          keys, numbers = np.concatenate([leftover_keys, keys]), np.concatenate([leftover_numbers, numbers])
+        n_samples = len(numbers) // single_sample_size
+        end = n_samples*single_sample_size
+        leftover_keys, leftover_numbers = keys[end:], numbers[end:]
+        if n_samples:
+          yield numbers[:end].reshape(n_samples, single_sample_size), keys[end - 1]
+    finally:
+      cursor.close()
+
+# Score the samples of ingest_samples
+# scorer: Called with each sample_arr, e.g., has_sequence_batch (the default)
+#         or model.predict_samples
+# checkpoint_filename: If given, the run starts after the key saved in it, and
+#                      the last key of each chunk is saved to it once the
+#                      caller has handled the chunk, i.e., asks for the next one
+# Yields (sample_arr, scores, last_key)
+def ingest(pool, scorer=has_sequence_batch, checkpoint_filename=None, **ingest_args):
+  if checkpoint_filename:
+    ingest_args['last_key'] = load_checkpoint(checkpoint_filename)
+  for sample_arr, last_key in ingest_samples(pool, **ingest_args):
+    yield sample_arr, scorer(sample_arr), last_key
+    if checkpoint_filename:
+      save_checkpoint(checkpoint_filename, last_key)
+
+# Write samples generated samples (parts in turn, FIXTURE_PARTS by default) to the table of a
+# SQLite database, replacing the table if it is there
+# The numbers are in (key_column INTEGER PRIMARY KEY, number_column INTEGER),
+# keys from 1, and the class of each sample in <table>_labels (sample, class),
+# sample i holding the keys [i*single_sample_size + 1, (i + 1)*single_sample_size]
+# Returns the number of numbers written
+def create_sqlite_fixture(filename, samples, single_sample_size=SINGLE_SAMPLE_SIZE_50, seed=0, table=TABLE, key_column=KEY_COLUMN, number_column=NUMBER_COLUMN, parts=None):
+  _check_identifiers(table, key_column, number_column)
+  parts = parts or FIXTURE_PARTS
+  # Interleaved parts all have the same rows, only the first samples rows are written
+  rounds = -(-samples // len(parts))
+  job = make_job(filename, [dict(part, rows=rounds) for part in parts], single_sample_size, interleave=True, stream=FIXTURE_STREAM)
+  connection = sqlite3.connect(filename)
+  try:
+    # A fixture does not need to survive a crash
+    connection.execute("PRAGMA journal_mode = OFF")
+    connection.execute("PRAGMA synchronous = OFF")
+    connection.execute("DROP TABLE IF EXISTS %s" % table)
+    connection.execute("DROP TABLE IF EXISTS %s_labels" % table)
+    connection.execute("CREATE TABLE %s (%s INTEGER PRIMARY KEY, %s INTEGER NOT NULL)" % (table, key_column, number_column))
+    connection.execute("CREATE TABLE %s_labels (sample INTEGER PRIMARY KEY, class TEXT NOT NULL)" % table)
+    chunk_rows = job_chunk_rows(job)
+    for start in range(0, samples, chunk_rows):
+      end = min(start + chunk_rows, samples)
+      sample_arr, _, labels = generate_chunk(job, start, end, seed)
+      first_key = start*single_sample_size + 1
+      keys = range(first_key, first_key + sample_arr.size)
+      connection.executemany("INSERT INTO %s VALUES (?, ?)" % table, zip(keys, sample_arr.ravel().tolist()))
+      connection.executemany("INSERT INTO %s_labels VALUES (?, ?)" % table, zip(range(start, end), [CLASS_NAMES[label] for label in labels]))
+    connection.commit()
+  finally:
+    connection.close()
+  return samples*single_sample_size
+
+def main(argv=None):
+  parser = argparse.ArgumentParser()
+  parser.add_argument("database", help="SQLite database file")
+  parser.add_argument("--create_fixture", help="Write this many samples to the database first", type=int, default=None)
+  parser.add_argument("--table", default=TABLE)
+  parser.add_argument("--single_sample_size", type=int, default=SINGLE_SAMPLE_SIZE_50)
+  parser.add_argument("--fetch_rows", type=int, default=FETCH_ROWS)
+  parser.add_argument("--scorer", choices=['detector', 'model'], default='detector')
+  parser.add_argument("--checkpoint", help="Resume from and save the last key to this file", default=None)
+  parser.add_argument("--seed", type=int, default=0)
+  args = parser.parse_args(argv)
+
+  if args.create_fixture is not None:
+    start = time.perf_counter()
+    numbers = create_sqlite_fixture(args.database, args.create_fixture, args.single_sample_size, args.seed, args.table)
+    print("Created: %s, %d numbers in %.2fs" % (args.database, numbers, time.perf_counter() - start))
+
+  if args.scorer == 'model':
+    # Imported here, the model is only needed to score with it
+    from serial_hunter_model import load_model
+    model = load_model()
+    scorer = lambda sample_arr: np.argmax(model.predict_samples(sample_arr), axis=1)
+  else:
+    scorer = has_sequence_batch
+  counts = np.zeros(len(CLASS_NAMES), dtype=np.int64)
+  last_key = load_checkpoint(args.checkpoint) if args.checkpoint else None
+  start = time.perf_counter()
+  with ConnectionPool(lambda: sqlite3.connect(args.database), size=1) as pool:
+    for sample_arr, scores, last_key in ingest(pool, scorer, args.checkpoint, table=args.table, single_sample_size=args.single_sample_size, fetch_rows=args.fetch_rows):
+      # The detector only tells sequence (1, counted as the first sequence class) or none (0)
+      counts += np.bincount(np.asarray(scores, dtype=np.int64), minlength=len(CLASS_NAMES))
+  elapsed = time.perf_counter() - start
+  samples = counts.sum()
+  print("%d samples (%d numbers) in %.2fs: %.0f numbers/s, last key: %s" % (samples, samples*args.single_sample_size, elapsed, samples*args.single_sample_size/max(elapsed, 1e-9), last_key))
+  if args.scorer == 'model':
+    print(", ".join("%s: %d" % (class_name, count) for class_name, count in zip(CLASS_NAMES, counts)))
+  else:
+    print("With a sequence: %d, none: %d" % (counts[1:].sum(), counts[0]))
+
+if __name__ == "__main__":
+  main()
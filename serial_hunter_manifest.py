@@ -0,0 +1,140 @@
+# Dataset manifest: which data files to generate and how
+#
+# The manifest (serial_hunter_manifest.json by default) is a JSON file:
+#   {
+#     "defaults": {"single_sample_size": 50, "with_pos": false, "interleave": false, "seq_count": 5, "seq_pos": 0, "in_order": true},
+#     "outputs": [
+#       {"filename": "data_sequence_mid_sparse_20000_sample_number_50_w_pos.csv", "corpus": "with_pos", "with_pos": true, "parts": [
+#         {"class": "sparse", "placement": "sparse", "rows": 20000, "seq_pos": 5}
+#       ]},
+#       ...
+#     ]
+#   }
+#
+# Output fields:
+# * filename: The CSV file to write
+# * format: "csv", "bin" (serial_hunter_binary.py, the filename then ends with .bin instead of .csv)
+#           "digits" (serial_hunter_digits.py, the filename then ends with .npy)
+#           or "bcd" (packed decimal, serial_hunter_bcd.py, the filename then ends with .bcd)
+# * compression: "gzip" or "zstd" to compress a CSV file, the filename then also ends with .gz or .zst
+# * corpus: "default" or "with_pos", i.e., which run of serial_hunter_data_gen.py creates it
+# * include_50000: Only generated with --include_50000
+# * single_sample_size: Numbers in each sample
+# * with_pos: Prepend the '0'/'1' position index columns
+# * interleave: Alternate the rows of the parts instead of writing them one after another
+# * pos_format: "columns" (default) or "mask", how with_pos writes the position
+#               index of a CSV file, see serial_hunter_mask.py
+# * prefix_of: The filename of a larger output, the rows of this file are then
+#              drawn from its random streams, i.e., they are its first rows (in
+#              any format), e.g., the 5 row prediction sets. The parts must be
+#              the first parts of the other output, with the last one possibly
+#              having fewer rows
+# * parts: The rows of the file, each part has
+#   * class: One of CLASSES, i.e., the expected outcome of the rows
+#   * placement: "sparse", "head_heavy", "tail_heavy" or "pct" (which also needs start_pct and end_pct)
+#   * rows, seq_count, seq_pos (mid), in_order (ooo)
+#   * min_gap, max_gap: Range of the gaps between the sequence numbers, 1 and
+#     THRESHOLD_GAP if not given, e.g., THRESHOLD_GAP + 1 for both in the near
+#     miss rows, see serial_hunter_near_miss.py
+#
+# Any output or part field that is missing is taken from "defaults"
+
+import fnmatch
+import json
+import os
+
+from serial_hunter_batch import PLACEMENT_SPARSE, PLACEMENT_HEAD_HEAVY, PLACEMENT_TAIL_HEAVY, PLACEMENT_PCT
+from serial_hunter_config import CLASSES, NUMBER_SIZE, THRESHOLD_GAP
+from serial_hunter_csv import COMPRESSION_EXTENSIONS
+from serial_hunter_mask import POS_FORMAT_COLUMNS
+from serial_hunter_pool import FORMAT_CSV, FORMAT_EXTENSIONS, make_part, make_job
+
+MANIFEST_FILENAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'serial_hunter_manifest.json')
+
+CORPUS_DEFAULT = 'default'
+CORPUS_WITH_POS = 'with_pos'
+
+PLACEMENTS = [PLACEMENT_SPARSE, PLACEMENT_HEAD_HEAVY, PLACEMENT_TAIL_HEAVY, PLACEMENT_PCT]
+
+def load_manifest(filename=MANIFEST_FILENAME):
+  with open(filename) as manifest_file:
+    return json.load(manifest_file)
+
+def _part_to_job_part(filename, part, defaults):
+  part = dict(defaults, **part)
+  if part.get('class') not in CLASSES:
+    raise ValueError("%s: class: %s must be one of %s" % (filename, part.get('class'), list(CLASSES.keys())))
+  if part.get('placement') not in PLACEMENTS:
+    raise ValueError("%s: placement: %s must be one of %s" % (filename, part.get('placement'), PLACEMENTS))
+  if part['placement'] == PLACEMENT_PCT and (part.get('start_pct') is None or part.get('end_pct') is None):
+    raise ValueError("%s: placement: %s needs start_pct and end_pct" % (filename, PLACEMENT_PCT))
+  if not isinstance(part.get('rows'), int) or part['rows'] <= 0:
+    raise ValueError("%s: rows: %s must be a positive integer" % (filename, part.get('rows')))
+  if not 0 <= part['seq_pos'] < NUMBER_SIZE:
+    raise ValueError("%s: seq_pos: %d must be less than NUMBER_SIZE: %d" % (filename, part['seq_pos'], NUMBER_SIZE))
+  min_gap, max_gap = part.get('min_gap', 1), part.get('max_gap', THRESHOLD_GAP)
+  if not isinstance(min_gap, int) or not isinstance(max_gap, int) or not 1 <= min_gap <= max_gap:
+    raise ValueError("%s: min_gap: %s and max_gap: %s must be integers, 1 <= min_gap <= max_gap" % (filename, min_gap, max_gap))
+  return make_part(part['class'], part['placement'], part['rows'], part['seq_count'], part['seq_pos'], part['in_order'], part.get('start_pct'), part.get('end_pct'), min_gap, max_gap)
+
+# output_format: If given, overrides the format of the output
+# compression: If given, the CSV output is compressed and its filename gets the
+#              compression extension, e.g., .csv.gz
+# pos_format: If given, overrides the pos_format of the output
+def output_to_job(output, defaults, output_format=None, compression=None, pos_format=None):
+  filename = output['filename']
+  stream = output.get('prefix_of', filename)
+  output = dict(defaults, **output)
+  parts = [_part_to_job_part(filename, part, defaults) for part in output['parts']]
+  output_format = output_format or output.get('format', FORMAT_CSV)
+  if output_format != FORMAT_CSV:
+    filename = os.path.splitext(filename)[0] + FORMAT_EXTENSIONS[output_format]
+  # Only CSV files are compressed, make_job checks the compression
+  compression = (compression or output.get('compression')) if output_format == FORMAT_CSV else None
+  if compression:
+    filename += COMPRESSION_EXTENSIONS.get(compression, '')
+  pos_format = pos_format or output.get('pos_format', POS_FORMAT_COLUMNS)
+  return make_job(filename, parts, output['single_sample_size'], output['with_pos'], output['interleave'], output_format, stream, compression, pos_format)
+
+def _check_prefix(job, source_job):
+  parts, source_parts = job['parts'], source_job['parts']
+  if job['interleave'] or source_job['interleave'] or job['single_sample_size'] != source_job['single_sample_size'] or len(parts) > len(source_parts):
+    return False
+  if parts[:-1] != source_parts[:len(parts) - 1]:
+    return False
+  last, source_last = dict(parts[-1]), dict(source_parts[len(parts) - 1])
+  return last.pop('rows') <= source_last.pop('rows') and last == source_last
+
+def _is_selected(output, corpora, include_50000, only):
+  if only:
+    return any(fnmatch.fnmatch(output['filename'], pattern) for pattern in only)
+  return output.get('corpus') in corpora and (include_50000 or not output.get('include_50000', False))
+
+# Turn the manifest outputs into the jobs to run
+# corpora: Which corpus ("default", "with_pos") to generate
+# only: If given, a list of filename patterns (fnmatch) and only the matching
+#       outputs of any corpus are generated, e.g., just the files a training run needs
+# output_format: If given, all the outputs are written in this format
+# compression: If given, all the (CSV) outputs are compressed with it
+# pos_format: If given, all the (CSV) outputs write their position index in this format
+# Every output is generated exactly once, outputs listed more than once (e.g.,
+# the same no sequence file used by several training sets) must be identical
+def plan_jobs(manifest, corpora=(CORPUS_DEFAULT,), include_50000=False, only=None, output_format=None, compression=None, pos_format=None):
+  defaults = manifest.get('defaults', {})
+  outputs = dict((output['filename'], output) for output in manifest['outputs'])
+  jobs = []
+  planned = {}
+  for output in manifest['outputs']:
+    if not _is_selected(output, corpora, include_50000, only):
+      continue
+    job = output_to_job(output, defaults, output_format, compression, pos_format)
+    if 'prefix_of' in output:
+      if output['prefix_of'] not in outputs or not _check_prefix(job, output_to_job(outputs[output['prefix_of']], defaults)):
+        raise ValueError("%s: prefix_of: %s must be an output whose first rows have the same settings" % (output['filename'], output['prefix_of']))
+    if job['filename'] in planned:
+      if planned[job['filename']] != job:
+        raise ValueError("%s is listed more than once with different settings" % job['filename'])
+      continue
+    planned[job['filename']] = job
+    jobs.append(job)
+  return jobs
@@ -0,0 +1,84 @@
+# Bit-packed position masks
+#
+# The position index of a sample (which of its numbers are part of the
+# sequence) used to be single_sample_size '0'/'1' strings per row. A
+# PositionMask holds it as bits instead: bit i (least significant first) of a
+# row is set if the number in column i is part of the sequence, packed into
+# mask_words(cols) uint64 words per row, i.e., a single uint64 for samples of
+# up to 64 numbers. Same layout as the pos_mask of serial_hunter_binary.py
+#
+# Building one from the seq_idx_arr of the batch generators is one OR per
+# sequence element for all the rows at once, and popcount / test are O(1)
+# per row
+#
+# The CSV data files can carry it (--pos_format mask) as mask_words(cols)
+# integer columns, i.e., one column for 50 numbers, instead of the cols '0'/'1'
+# position index columns
+
+import numpy as np
+
+WORD_BITS = 64
+
+POS_FORMAT_COLUMNS = 'columns'
+POS_FORMAT_MASK = 'mask'
+POS_FORMATS = [POS_FORMAT_COLUMNS, POS_FORMAT_MASK]
+
+def mask_words(cols):
+  return (cols + WORD_BITS - 1) // WORD_BITS
+
+def _popcount(words):
+  if hasattr(np, 'bitwise_count'):
+    return np.bitwise_count(words)
+  # SWAR popcount for numpy < 2.0
+  words = words - ((words >> np.uint64(1)) & np.uint64(0x5555555555555555))
+  words = (words & np.uint64(0x3333333333333333)) + ((words >> np.uint64(2)) & np.uint64(0x3333333333333333))
+  words = (words + (words >> np.uint64(4))) & np.uint64(0x0f0f0f0f0f0f0f0f)
+  with np.errstate(over='ignore'):
+    return (words * np.uint64(0x0101010101010101)) >> np.uint64(56)
+
+class PositionMask:
+  # words: (rows, mask_words(cols)) uint64
+  # cols: Numbers in each sample
+  def __init__(self, words, cols):
+    self.words = np.asarray(words, dtype=np.uint64).reshape(-1, mask_words(cols))
+    self.cols = cols
+
+  # seq_idx_arr: (rows, seq_count) columns of the sequence elements, as returned by the batch generators
+  @classmethod
+  def from_seq_idx(cls, seq_idx_arr, cols):
+    seq_idx_arr = np.asarray(seq_idx_arr, dtype=np.int64)
+    words = np.zeros((len(seq_idx_arr), mask_words(cols)), dtype=np.uint64)
+    rows = np.arange(len(seq_idx_arr))
+    # The columns of a row are different, so every row gets one bit per element
+    for idx in seq_idx_arr.T:
+      words[rows, idx // WORD_BITS] |= np.uint64(1) << (idx % WORD_BITS).astype(np.uint64)
+    return cls(words, cols)
+
+  # pos_index_arr: (rows, cols) '0'/'1' position index columns
+  @classmethod
+  def from_pos_index_arr(cls, pos_index_arr):
+    pos_index_arr = np.asarray(pos_index_arr, dtype=np.uint8)
+    rows, cols = pos_index_arr.shape
+    packed = np.zeros((rows, mask_words(cols)*8), dtype=np.uint8)
+    packed[:, :(cols + 7)//8] = np.packbits(pos_index_arr, axis=1, bitorder='little')
+    return cls(packed.view('<u8'), cols)
+
+  def pos_index_arr(self):
+    bits = np.unpackbits(self.words.astype('<u8').view(np.uint8), axis=1, bitorder='little')
+    return bits[:, :self.cols]
+
+  # Number of sequence elements in each row
+  def popcount(self):
+    return _popcount(self.words).sum(axis=1, dtype=np.int64)
+
+  # Whether the number in column col of each row is part of the sequence
+  def test(self, col):
+    if not 0 <= col < self.cols:
+      raise IndexError("col: %d must be less than cols: %d" % (col, self.cols))
+    return ((self.words[:, col // WORD_BITS] >> np.uint64(col % WORD_BITS)) & np.uint64(1)).astype(bool)
+
+  def __len__(self):
+    return len(self.words)
+
+  def __getitem__(self, rows):
+    return PositionMask(self.words[rows], self.cols)
@@ -0,0 +1,335 @@
+# NumPy inference for the saved Keras models
+#
+# Scoring with the models trained in the notebooks only needs the forward pass,
+# so instead of importing TensorFlow/Keras this reads the architecture (.json)
+# and the weights (.h5) and runs the layers as NumPy matrix products:
+# * Conv2D with strides equal to its kernel (e.g., 1x15 with stride 15, one
+#   window per number) is a reshape of the digits to (windows, kernel) followed
+#   by one matrix product, other strides use a sliding window view
+# * MaxPooling2D the same way (1x1 pools are skipped)
+# * Flatten in channels_last order, same as Keras
+# * Dense is a matrix product
+#
+# The first Conv2D of the CNN has a 1 x NUMBER_SIZE kernel with the same stride
+# over digits, and the 1x1 Conv2D after it works on each number on its own,
+# i.e., their output for a number only depends on the number. With the numbers
+# at hand (predict_samples) it is looked up instead, see NumberEmbedding: the
+# kernel times every value of EMBEDDING_DIGITS digits is computed once, so the
+# first layer is a sum of a few table rows, and the output of the numbers seen
+# lately is cached. It only pays off when numbers come back, for new numbers it
+# is a bit slower than the matrix products (benchmarks/bench_model_embedding.py),
+# load_model(embedding=False) turns it off
+#
+# Reading the .h5 needs h5py, which alone takes a good part of a second to
+# import. export_npz saves the architecture and weights into one .npz, and
+# loading that only needs NumPy
+
+import json
+import os
+import threading
+
+import numpy as np
+
+from serial_hunter_config import CLASSES, NUMBER_SIZE
+from serial_hunter_digits import numbers_to_digit_tensor
+
+MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_NAME = 'cnn_model_G_50_coarse-multi_class_non_binary_sparse-tail_heavy-head_heavy_train_mid_ooo_10000-sample_71-pct-20190518'
+MODEL_FILENAME = os.path.join(MODEL_DIR, MODEL_NAME + '.h5')
+
+CLASS_NAMES = list(CLASSES.keys())
+
+# Digits of a number looked up at once by NumberEmbedding, i.e., 10**EMBEDDING_DIGITS rows per group of digits
+EMBEDDING_DIGITS = 3
+# Numbers whose first layer output is cached, a power of 2
+EMBEDDING_CACHE_SIZE = 1 << 16
+# Numbers summed at a time, so their output stays in the CPU cache across the groups
+EMBEDDING_BLOCK = 4096
+_GOLDEN_GAMMA = np.uint64(0x9e3779b97f4a7c15)
+
+def _relu(x):
+  return np.maximum(x, 0, out=x)
+
+def _sigmoid(x):
+  np.negative(x, out=x)
+  # exp overflows to inf for very negative inputs, which still gives 0
+  with np.errstate(over='ignore'):
+    np.exp(x, out=x)
+  x += 1
+  return np.reciprocal(x, out=x)
+
+def _softmax(x):
+  x -= x.max(axis=-1, keepdims=True)
+  np.exp(x, out=x)
+  x /= x.sum(axis=-1, keepdims=True)
+  return x
+
+def _linear(x):
+  return x
+
+ACTIVATIONS = {'relu': _relu, 'sigmoid': _sigmoid, 'softmax': _softmax, 'linear': _linear}
+
+def _activation(config):
+  activation = config.get('activation', 'linear')
+  if activation not in ACTIVATIONS:
+    raise ValueError("%s: activation: %s is not supported" % (config['name'], activation))
+  return ACTIVATIONS[activation]
+
+def _check_valid_channels_last(config):
+  if config.get('padding', 'valid') != 'valid' or config.get('data_format', 'channels_last') != 'channels_last':
+    raise ValueError("%s: only padding: valid and data_format: channels_last are supported" % config['name'])
+
+# Windows of x (batch, height, width, channels) as (batch, out_height, out_width, kh, kw, channels)
+def _windows(x, kernel_size, strides):
+  (kh, kw), (sh, sw) = kernel_size, strides
+  batch, height, width, channels = x.shape
+  out_height, out_width = (height - kh) // sh + 1, (width - kw) // sw + 1
+  if (kh, kw) == (sh, sw):
+    x = x[:, :out_height*kh, :out_width*kw]
+    return x.reshape(batch, out_height, kh, out_width, kw, channels).transpose(0, 1, 3, 2, 4, 5)
+  windows = np.lib.stride_tricks.sliding_window_view(x, (kh, kw), axis=(1, 2))[:, ::sh, ::sw]
+  return windows.transpose(0, 1, 2, 4, 5, 3)
+
+def _conv2d(config, weights):
+  _check_valid_channels_last(config)
+  kernel, bias = weights if config.get('use_bias', True) else (weights[0], None)
+  kernel_size, strides = tuple(config['kernel_size']), tuple(config['strides'])
+  matrix = np.ascontiguousarray(kernel.reshape(-1, kernel.shape[-1]))
+  activation = _activation(config)
+  def layer(x):
+    windows = _windows(x, kernel_size, strides)
+    out = windows.reshape(-1, matrix.shape[0]) @ matrix
+    if bias is not None:
+      out += bias
+    return activation(out).reshape(windows.shape[:3] + (matrix.shape[1],))
+  return layer
+
+def _max_pooling2d(config, weights):
+  _check_valid_channels_last(config)
+  pool_size, strides = tuple(config['pool_size']), tuple(config['strides'] or config['pool_size'])
+  if pool_size == (1, 1) and strides == (1, 1):
+    return None
+  def layer(x):
+    return _windows(x, pool_size, strides).max(axis=(3, 4))
+  return layer
+
+def _flatten(config, weights):
+  def layer(x):
+    return x.reshape(x.shape[0], -1)
+  return layer
+
+def _dense(config, weights):
+  kernel, bias = weights if config.get('use_bias', True) else (weights[0], None)
+  activation = _activation(config)
+  def layer(x):
+    out = x @ kernel
+    if bias is not None:
+      out += bias
+    return activation(out)
+  return layer
+
+LAYERS = {'Conv2D': _conv2d, 'MaxPooling2D': _max_pooling2d, 'Flatten': _flatten, 'Dense': _dense}
+
+# The output of a Conv2D over digits whose kernel covers one whole number (and
+# strides by it), computed from the numbers. The kernel is linear in the
+# digits, so for each group of group_digits digits the kernel times every
+# value of the group is precomputed (the bias is added to the first group),
+# and the output of a number is the sum of one table row per group, then the
+# activation. layers are the 1x1 Conv2D right after it, which also work on
+# each number on its own, so they are part of the output of a number too
+#
+# The output of the last cache_size numbers (a direct mapped cache, a number
+# evicts the one in its slot) is kept, as the same numbers come back batch
+# after batch
+class NumberEmbedding:
+  # kernel: (1, number_size, 1, filters)
+  # layers: Layer functions taking and returning (n, 1, 1, channels)
+  def __init__(self, kernel, bias, activation, layers=(), group_digits=EMBEDDING_DIGITS, cache_size=EMBEDDING_CACHE_SIZE, dtype=np.float32):
+    if cache_size & (cache_size - 1):
+      raise ValueError("cache_size: %d must be a power of 2" % cache_size)
+    number_size, filters = kernel.shape[1], kernel.shape[-1]
+    kernel = kernel.reshape(number_size, filters).astype(np.float64)
+    self.number_size = number_size
+    self.activation = activation
+    self.layers = list(layers)
+    # Groups from the least significant digit, the most significant one may be shorter
+    tables, divisors, moduli = [], [], []
+    for end in range(number_size, 0, -group_digits):
+      size = min(group_digits, end)
+      values = np.arange(10**size, dtype=np.int64)
+      digits = (values[:, None] // 10**np.arange(size - 1, -1, -1, dtype=np.int64)) % 10
+      tables.append(digits @ kernel[end - size:end])
+      divisors.append(10**(number_size - end))
+      moduli.append(10**size)
+    if bias is not None:
+      tables[0] += bias
+    self.table = np.ascontiguousarray(np.concatenate(tables), dtype=dtype)
+    # (groups, 1), to split a block of numbers into (groups, block) table rows
+    self.divisors = np.array(divisors, dtype=np.int64)[:, None]
+    self.moduli = np.array(moduli, dtype=np.int64)[:, None]
+    self.offsets = np.cumsum([0] + moduli[:-1]).astype(np.int64)[:, None]
+    self.outputs = self.compute(np.zeros(1, dtype=np.int64)).shape[1]
+    self.cache_shift = np.uint64(64 - cache_size.bit_length() + 1)
+    self.cache_numbers = np.full(cache_size, -1, dtype=np.int64)
+    self.cache_outputs = np.zeros((cache_size, self.outputs), dtype=dtype)
+    self.hits = 0
+    self.misses = 0
+    self.lock = threading.Lock()
+
+  # numbers: (n,) int64, Returns (n, outputs)
+  def compute(self, numbers):
+    out = np.empty((len(numbers), self.table.shape[1]), dtype=self.table.dtype)
+    for start in range(0, len(numbers), EMBEDDING_BLOCK):
+      rows = (numbers[start:start+EMBEDDING_BLOCK] // self.divisors) % self.moduli + self.offsets
+      block = out[start:start+EMBEDDING_BLOCK]
+      np.take(self.table, rows[0], axis=0, out=block)
+      for group_rows in rows[1:]:
+        block += np.take(self.table, group_rows, axis=0)
+    out = self.activation(out)
+    for layer in self.layers:
+      out = layer(out.reshape(len(out), 1, 1, -1))
+    return out.reshape(len(numbers), -1)
+
+  # numbers: Any shape of numbers of number_size digits, Returns numbers.shape + (outputs,)
+  def __call__(self, numbers):
+    numbers = np.asarray(numbers, dtype=np.int64)
+    flat = numbers.reshape(-1)
+    # Fibonacci hashing of the numbers into the cache slots
+    slots = ((flat.view(np.uint64) * _GOLDEN_GAMMA) >> self.cache_shift).astype(np.intp)
+    with self.lock:
+      miss = np.flatnonzero(np.take(self.cache_numbers, slots) != flat)
+      if len(miss) == len(flat):
+        out = self.compute(flat)
+        self.cache_outputs[slots] = out
+      else:
+        out = np.take(self.cache_outputs, slots, axis=0)
+        if len(miss):
+          missed = self.compute(flat[miss])
+          out[miss] = missed
+          self.cache_outputs[slots[miss]] = missed
+      self.cache_numbers[slots[miss]] = flat[miss]
+      self.hits += len(flat) - len(miss)
+      self.misses += len(miss)
+    return out.reshape(numbers.shape + (self.outputs,))
+
+# A NumberEmbedding of the first layers if the first one is a Conv2D whose
+# kernel covers one number of the digits input (1 x number_size, stride the
+# same, 1 channel), otherwise None
+# layers: [(class_name, config, weights, layer function)] of the model
+def _number_embedding(layers, input_shape, dtype):
+  class_name, config, weights, _ = layers[0]
+  if class_name != 'Conv2D' or len(input_shape) != 3 or input_shape[0] != 1 or input_shape[2] != 1:
+    return None
+  kernel_size, strides = tuple(config['kernel_size']), tuple(config['strides'])
+  if kernel_size != strides or kernel_size[0] != 1 or input_shape[1] % kernel_size[1]:
+    return None
+  kernel, bias = weights if config.get('use_bias', True) else (weights[0], None)
+  pointwise = []
+  for next_class_name, next_config, _, layer in layers[1:]:
+    if next_class_name != 'Conv2D' or tuple(next_config['kernel_size']) != (1, 1) or tuple(next_config['strides']) != (1, 1):
+      break
+    pointwise.append(layer)
+  return NumberEmbedding(kernel, bias, _activation(config), pointwise, dtype=dtype)
+
+class NumpyModel:
+  # architecture: The Keras model JSON (the .json file next to the .h5), as a dict
+  # weights: {layer name: [kernel, bias]}
+  # embedding: Compute the first layers of predict_samples with a NumberEmbedding if they can be
+  def __init__(self, architecture, weights, dtype=np.float32, embedding=True):
+    if architecture.get('class_name') != 'Sequential':
+      raise ValueError("Only Sequential models are supported, not %s" % architecture.get('class_name'))
+    config = architecture['config']
+    layer_configs = config['layers'] if isinstance(config, dict) else config
+    self.dtype = dtype
+    self.input_shape = tuple(layer_configs[0]['config']['batch_input_shape'][1:])
+    self.layers = []
+    built = []
+    for layer_config in layer_configs:
+      class_name, layer_config = layer_config['class_name'], layer_config['config']
+      if class_name not in LAYERS:
+        raise ValueError("%s: layer %s is not supported" % (layer_config['name'], class_name))
+      layer_weights = [np.asarray(w, dtype=dtype) for w in weights.get(layer_config['name'], [])]
+      layer = LAYERS[class_name](layer_config, layer_weights)
+      if layer is not None:
+        self.layers.append(layer)
+        built.append((class_name, layer_config, layer_weights, layer))
+    self.embedding = _number_embedding(built, self.input_shape, dtype) if embedding and built else None
+
+  # Same as Keras predict
+  # x: (batch,) + input_shape, e.g., (batch, 1, 750, 1) digits, or input_shape for one sample
+  # Returns (batch, outputs) float
+  def predict(self, x, batch_size=None):
+    x = np.asarray(x, dtype=self.dtype)
+    if x.shape == self.input_shape:
+      x = x[None]
+    if x.shape[1:] != self.input_shape:
+      raise ValueError("x: %s is not (batch,) + the model input shape: %s" % (x.shape, self.input_shape))
+    if batch_size is not None and len(x) > batch_size:
+      return np.concatenate([self.predict(x[start:start+batch_size]) for start in range(0, len(x), batch_size)])
+    return self._forward(x, self.layers)
+
+  def _forward(self, x, layers):
+    for layer in layers:
+      x = layer(x)
+    return x
+
+  # sample_arr: (rows, cols) numbers, cols*number_size being the digits of the model input
+  def predict_samples(self, sample_arr, number_size=NUMBER_SIZE, batch_size=None):
+    sample_arr = np.atleast_2d(sample_arr)
+    if sample_arr.ndim != 2 or sample_arr.shape[1]*number_size != self.input_shape[1]:
+      raise ValueError("sample_arr: %s is not (rows, %g) numbers of %d digits, the model takes %d digits" % (
+        sample_arr.shape, self.input_shape[1] / number_size, number_size, self.input_shape[1]))
+    if self.embedding is None or self.embedding.number_size != number_size:
+      return self.predict(numbers_to_digit_tensor(sample_arr, number_size), batch_size)
+    if batch_size is not None and len(sample_arr) > batch_size:
+      return np.concatenate([self.predict_samples(sample_arr[start:start+batch_size], number_size) for start in range(0, len(sample_arr), batch_size)])
+    # (rows, 1, cols, outputs), the output of the layers of the embedding
+    x = self.embedding(sample_arr)[:, None]
+    return self._forward(x, self.layers[1 + len(self.embedding.layers):])
+
+  # Returns the CLASSES name of each row of predict_samples
+  def classify_samples(self, sample_arr, number_size=NUMBER_SIZE, batch_size=None):
+    return [CLASS_NAMES[i] for i in self.predict_samples(sample_arr, number_size, batch_size).argmax(axis=1)]
+
+def json_filename(filename):
+  return os.path.splitext(filename)[0] + '.json'
+
+# Returns (architecture, weights) from the Keras .h5 and the .json next to it
+def read_h5(filename=MODEL_FILENAME):
+  import h5py
+  with open(json_filename(filename)) as json_file:
+    architecture = json.load(json_file)
+  weights = {}
+  with h5py.File(filename, mode='r') as h5_file:
+    model_weights = h5_file['model_weights'] if 'model_weights' in h5_file else h5_file
+    for name in model_weights.attrs['layer_names']:
+      name = name.decode('utf8') if isinstance(name, bytes) else name
+      group = model_weights[name]
+      weight_names = [n.decode('utf8') if isinstance(n, bytes) else n for n in group.attrs['weight_names']]
+      weights[name] = [group[weight_name][()] for weight_name in weight_names]
+  return architecture, weights
+
+# Save the model as one .npz that load_model can read without h5py
+def export_npz(filename=MODEL_FILENAME, npz_filename=None):
+  npz_filename = npz_filename or os.path.splitext(filename)[0] + '.npz'
+  architecture, weights = read_h5(filename)
+  arrays = {'architecture': np.array(json.dumps(architecture))}
+  for name, layer_weights in weights.items():
+    for i, w in enumerate(layer_weights):
+      arrays['%s/%d' % (name, i)] = w
+  np.savez(npz_filename, **arrays)
+  return npz_filename
+
+def read_npz(filename):
+  with np.load(filename) as npz_file:
+    architecture = json.loads(str(npz_file['architecture']))
+    weights = {}
+    for key in sorted((key for key in npz_file.files if key != 'architecture'), key=lambda key: int(key.rsplit('/', 1)[1])):
+      weights.setdefault(key.rsplit('/', 1)[0], []).append(npz_file[key])
+  return architecture, weights
+
+# filename: The Keras .h5 (with its .json next to it) or a .npz made by export_npz
+def load_model(filename=MODEL_FILENAME, dtype=np.float32, embedding=True):
+  if filename.endswith('.npz'):
+    return NumpyModel(*read_npz(filename), dtype=dtype, embedding=embedding)
+  return NumpyModel(*read_h5(filename), dtype=dtype, embedding=embedding)
@@ -0,0 +1,84 @@
+# Near miss rows, the hard negatives
+#
+# The four data types of DATA_TYPE_SIZE (serial_hunter_config.py), X being
+# THRESHOLD_SEQUENCE and Y THRESHOLD_GAP, as manifest / job parts:
+# 1. NEAR_MISS_SHORT_FAR: X - 1 numbers, each NEAR_MISS_GAP (Y + 1) after the other
+# 2. NEAR_MISS_SHORT: X - 1 numbers within Y of each other, one number short of a sequence
+# 3. NEAR_MISS_FAR: X numbers, each NEAR_MISS_GAP after the other, just too far apart
+# 4. NEAR_MISS_SEQ: X numbers within Y of each other
+# Types 1 to 3 have no sequence and are labelled "none". Type 4 is a sequence,
+# so it is labelled with the class of its placement (e.g., "sparse"), it is
+# there so that the chains of the others are not all the model sees
+#
+# The other numbers of the rows are picked from blocks of the gap (see
+# generate_non_seq_numbers_batch), so they never extend the chain, and the rows
+# are generated by the batch engine like every other part, in any format
+#
+# Each type goes in a file of its own (near_miss_jobs, and the data_near_miss_*
+# files of the manifest), so every file has a single class, like the other
+# data files: CSV files have no label column and are labelled by file
+#
+#   jobs = near_miss_jobs(5000, 50)
+
+import numpy as np
+
+from serial_hunter_batch import PLACEMENT_SPARSE, PLACEMENT_HEAD_HEAVY, PLACEMENT_TAIL_HEAVY
+from serial_hunter_config import THRESHOLD_GAP, THRESHOLD_SEQUENCE
+from serial_hunter_pool import make_job, make_part
+
+NEAR_MISS_SHORT_FAR = 'short_far'
+NEAR_MISS_SHORT = 'short'
+NEAR_MISS_FAR = 'far'
+NEAR_MISS_SEQ = 'seq'
+NEAR_MISS_TYPES = [NEAR_MISS_SHORT_FAR, NEAR_MISS_SHORT, NEAR_MISS_FAR, NEAR_MISS_SEQ]
+# The smallest gap that breaks a chain
+NEAR_MISS_GAP = THRESHOLD_GAP + 1
+EQUAL_PROPORTIONS = dict((near_miss_type, 1) for near_miss_type in NEAR_MISS_TYPES)
+
+# Class of the NEAR_MISS_SEQ rows for each placement
+PLACEMENT_CLASSES = {PLACEMENT_SPARSE: 'sparse', PLACEMENT_HEAD_HEAVY: 'head-heavy', PLACEMENT_TAIL_HEAVY: 'tail-heavy'}
+
+# The part of rows rows of near_miss_type
+# far_gap: The gap between the numbers of NEAR_MISS_SHORT_FAR and NEAR_MISS_FAR, at least NEAR_MISS_GAP
+def near_miss_part(near_miss_type, rows, placement=PLACEMENT_SPARSE, far_gap=NEAR_MISS_GAP):
+  if placement not in PLACEMENT_CLASSES:
+    raise ValueError("placement: %s must be one of %s" % (placement, list(PLACEMENT_CLASSES)))
+  if far_gap <= THRESHOLD_GAP:
+    raise ValueError("far_gap: %d must be more than THRESHOLD_GAP: %d" % (far_gap, THRESHOLD_GAP))
+  if near_miss_type == NEAR_MISS_SHORT_FAR:
+    return make_part('none', placement, rows, THRESHOLD_SEQUENCE - 1, min_gap=far_gap, max_gap=far_gap)
+  if near_miss_type == NEAR_MISS_SHORT:
+    return make_part('none', placement, rows, THRESHOLD_SEQUENCE - 1)
+  if near_miss_type == NEAR_MISS_FAR:
+    return make_part('none', placement, rows, THRESHOLD_SEQUENCE, min_gap=far_gap, max_gap=far_gap)
+  if near_miss_type == NEAR_MISS_SEQ:
+    return make_part(PLACEMENT_CLASSES[placement], placement, rows, THRESHOLD_SEQUENCE)
+  raise ValueError("near_miss_type: %s must be one of %s" % (near_miss_type, NEAR_MISS_TYPES))
+
+# Split rows rows into the near miss types in the given proportions
+# proportions: {near miss type: proportion}, the types that are not given get no rows
+# Returns the parts, one per type with rows, the rows of each type are
+# floor(rows*cumulative proportion) apart so they add up to rows
+# NEAR_MISS_SEQ is not "none", so a job of these parts has two classes, only
+# for the formats with labels (.bin, .npy, .bcd) or generate_rows
+def near_miss_parts(rows, proportions=EQUAL_PROPORTIONS, placement=PLACEMENT_SPARSE, far_gap=NEAR_MISS_GAP):
+  unknown = set(proportions) - set(NEAR_MISS_TYPES)
+  if unknown:
+    raise ValueError("proportions: %s are not near miss types: %s" % (sorted(unknown), NEAR_MISS_TYPES))
+  weights = np.array([proportions.get(near_miss_type, 0) for near_miss_type in NEAR_MISS_TYPES], dtype=np.float64)
+  if np.any(weights < 0) or weights.sum() <= 0:
+    raise ValueError("proportions: %s must not be negative, and at least one must be positive" % proportions)
+  bounds = np.floor(rows*np.cumsum(weights)/weights.sum()).astype(np.int64)
+  bounds[-1] = rows
+  counts = np.diff(bounds, prepend=0)
+  return [near_miss_part(near_miss_type, int(count), placement, far_gap) for near_miss_type, count in zip(NEAR_MISS_TYPES, counts) if count > 0]
+
+def near_miss_filename(near_miss_type, rows, single_sample_size):
+  return 'data_near_miss_%s_%d_sample_number_%d.csv' % (near_miss_type, rows, single_sample_size)
+
+# One job per near miss type, rows rows each
+# types: The near miss types to make files of, all of them by default
+# job_args: More make_job arguments, e.g., output_format
+# Returns the jobs, see make_job
+def near_miss_jobs(rows, single_sample_size, types=NEAR_MISS_TYPES, placement=PLACEMENT_SPARSE, far_gap=NEAR_MISS_GAP, **job_args):
+  return [make_job(near_miss_filename(near_miss_type, rows, single_sample_size), [near_miss_part(near_miss_type, rows, placement, far_gap)], single_sample_size, **job_args) for near_miss_type in types]
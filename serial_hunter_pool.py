@@ -0,0 +1,267 @@
+# Multi-process generation of the data files
+#
+# A job describes one output file:
+#   {
+#     'filename': 'data_sequence_sparse_20000_sample_number_50_w_pos.csv',
+#     'format': 'csv',        # FORMAT_CSV, FORMAT_BIN (serial_hunter_binary.py), FORMAT_DIGITS (serial_hunter_digits.py) or FORMAT_BCD (serial_hunter_bcd.py)
+#     'stream': 'data_sequence_sparse_20000_sample_number_50_w_pos.csv',  # Name the random streams are derived from
+#     'single_sample_size': 50,
+#     'with_pos': True,       # Prepend the '0'/'1' position index columns
+#     'interleave': False,    # Alternate the rows of the parts instead of writing them one after another
+#     'compression': None,    # CSV files only, None or one of COMPRESSIONS (serial_hunter_csv.py)
+#     'pos_format': 'columns', # CSV files only, write the position index as '0'/'1' columns or as PositionMask words (serial_hunter_mask.py)
+#     'parts': [{'class': 'sparse', 'placement': 'sparse', 'rows': 20000, 'seq_count': 5, 'seq_pos': 0, 'in_order': True, 'min_gap': 1, 'max_gap': 4}],
+#   }
+#
+# Every file is split into chunks of chunk_rows rows (by default as many rows
+# as fit CHUNK_NUMBERS numbers, so wide samples, e.g., BATCH_NUMBER_COUNT or
+# 100,000 numbers, keep the memory of a chunk the same). Each chunk is generated
+# (and written to its own shard file) by a worker, then the shards are merged
+# in order into the output file. The chunks of CSV files are formatted by the
+# workers (format_csv_rows), and merged through a CSVWriter that compresses and
+# writes them from a background thread while the next chunks are generated.
+# Binary, digit and bcd files are created with their
+# full size upfront, so the workers write their rows straight into the output file.
+#
+# Each row has its own random stream derived from (seed, stream, row), see
+# serial_hunter_rng.py, so the output only depends on the seed, NOT on the
+# number of workers or chunk_rows, and any row can be regenerated on its own
+# (generate_rows). The stream defaults to the filename, and stays the same when
+# the file is written in another format, so the .csv and .bin files hold the same rows.
+# A file can also use the stream of a larger one (prefix_of in the manifest),
+# its rows are then the first rows of the larger file
+
+import json
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+from serial_hunter_batch import generate_samples_batch, seq_idx_to_pos_index_arr
+from serial_hunter_bcd import create_bcd_dataset, write_bcd_rows
+from serial_hunter_binary import CLASS_NAMES, create_binary_dataset, write_binary_rows
+from serial_hunter_cache import is_up_to_date, job_key, load_cache, record_files, save_cache
+from serial_hunter_config import MIN_NUMBER, MAX_NUMBER, THRESHOLD_GAP, THRESHOLD_SEQUENCE
+from serial_hunter_csv import COMPRESSIONS, CSVWriter, format_csv_rows
+from serial_hunter_digits import create_digit_dataset, labels_filename, write_digit_rows
+from serial_hunter_mask import POS_FORMAT_COLUMNS, POS_FORMAT_MASK, POS_FORMATS, PositionMask
+from serial_hunter_profile import NULL_STAGE, Profiler, profiling, stage
+from serial_hunter_rng import RowRNG, stream_key
+from serial_hunter_validate import find_contaminated_rows, report
+
+CHUNK_ROWS = 5000
+# Numbers in a chunk, i.e., CHUNK_ROWS samples of 50 numbers
+CHUNK_NUMBERS = 250000
+
+# Rows in each chunk of the job's file
+def job_chunk_rows(job):
+  return max(1, min(CHUNK_ROWS, CHUNK_NUMBERS // job['single_sample_size']))
+
+FORMAT_CSV = 'csv'
+FORMAT_BIN = 'bin'
+FORMAT_DIGITS = 'digits'
+FORMAT_BCD = 'bcd'
+FORMATS = [FORMAT_CSV, FORMAT_BIN, FORMAT_DIGITS, FORMAT_BCD]
+FORMAT_EXTENSIONS = {FORMAT_CSV: '.csv', FORMAT_BIN: '.bin', FORMAT_DIGITS: '.npy', FORMAT_BCD: '.bcd'}
+
+# start_pct and end_pct are only used by PLACEMENT_PCT
+# min_gap, max_gap: Range of the gaps between the sequence numbers, above
+#                   THRESHOLD_GAP for the near miss rows (serial_hunter_near_miss.py)
+def make_part(class_name, placement, rows, seq_count=THRESHOLD_SEQUENCE, seq_pos=0, in_order=True, start_pct=None, end_pct=None, min_gap=1, max_gap=THRESHOLD_GAP):
+  if not 1 <= min_gap <= max_gap:
+    raise ValueError("min_gap: %s and max_gap: %s must be 1 <= min_gap <= max_gap" % (min_gap, max_gap))
+  return {'class': class_name, 'placement': placement, 'rows': rows, 'seq_count': seq_count, 'seq_pos': seq_pos, 'in_order': in_order, 'start_pct': start_pct, 'end_pct': end_pct, 'min_gap': min_gap, 'max_gap': max_gap}
+
+def make_job(filename, parts, single_sample_size, with_pos=False, interleave=False, output_format=FORMAT_CSV, stream=None, compression=None, pos_format=POS_FORMAT_COLUMNS):
+  if interleave and len(set(p['rows'] for p in parts)) > 1:
+    raise ValueError("Interleaved parts of %s must all have the same number of rows" % filename)
+  if output_format not in FORMATS:
+    raise ValueError("%s: format: %s must be one of %s" % (filename, output_format, FORMATS))
+  if compression is not None and (output_format != FORMAT_CSV or compression not in COMPRESSIONS):
+    raise ValueError("%s: compression: %s must be one of %s, and only for %s files" % (filename, compression, COMPRESSIONS, FORMAT_CSV))
+  if pos_format not in POS_FORMATS:
+    raise ValueError("%s: pos_format: %s must be one of %s" % (filename, pos_format, POS_FORMATS))
+  return {'filename': filename, 'format': output_format, 'stream': stream or filename, 'single_sample_size': single_sample_size, 'with_pos': with_pos, 'interleave': interleave, 'compression': compression, 'pos_format': pos_format, 'parts': parts}
+
+def job_rows(job):
+  return sum(p['rows'] for p in job['parts'])
+
+# For the rows of the job's file, return the part index of each row
+def _row_parts(job, rows):
+  if job['interleave']:
+    return rows % len(job['parts'])
+  part_ends = np.cumsum([p['rows'] for p in job['parts']])
+  return np.searchsorted(part_ends, rows, side='right')
+
+# Class index (in CLASSES) of the rows of the job's file
+def row_labels(job, rows):
+  return np.array([CLASS_NAMES.index(p['class']) for p in job['parts']], dtype=np.uint8)[_row_parts(job, rows)]
+
+# Generate any rows of the job's file, e.g., just the one sample to debug
+# rows: Row indexes in the file
+# Returns (sample_arr, pos_index_arr, labels), pos_index_arr holds the '0'/'1'
+# position index columns and labels the class index (in CLASSES) of each row
+def generate_rows(job, rows, seed):
+  rows = np.asarray(rows, dtype=np.int64)
+  row_parts = _row_parts(job, rows)
+  key = stream_key(seed, job['stream'])
+  single_sample_size = job['single_sample_size']
+  sample_arr = np.empty((len(rows), single_sample_size), dtype=np.int64)
+  pos_index_arr = np.empty((len(rows), single_sample_size), dtype=np.uint8)
+  labels = row_labels(job, rows)
+  for part_index, part in enumerate(job['parts']):
+    part_rows = np.flatnonzero(row_parts == part_index)
+    if len(part_rows) == 0:
+      continue
+    # One RowRNG per part, so the draws of a row do not depend on the rows of the other parts
+    rng = RowRNG(key, rows[part_rows])
+    samples, seq_idx_arr = generate_samples_batch(len(part_rows), part['placement'], part['seq_count'], MIN_NUMBER, MAX_NUMBER, seq_pos=part['seq_pos'], min_gap=part['min_gap'], max_gap=part['max_gap'], in_order=part['in_order'], single_sample_size=single_sample_size, start_pct=part['start_pct'], end_pct=part['end_pct'], rng=rng)
+    sample_arr[part_rows] = samples
+    pos_index_arr[part_rows] = seq_idx_to_pos_index_arr(seq_idx_arr, single_sample_size)
+  return sample_arr, pos_index_arr, labels
+
+# Generate the rows [start, end) of the job's file, see generate_rows
+def generate_chunk(job, start, end, seed):
+  return generate_rows(job, np.arange(start, end), seed)
+
+# The class of all the rows of the job, or None if the parts have different classes
+def job_label(job):
+  labels = set(p['class'] for p in job['parts'])
+  return labels.pop() if len(labels) == 1 else None
+
+# All the files written for the job, the output file first
+def job_filenames(job):
+  if job['format'] in (FORMAT_DIGITS, FORMAT_BCD):
+    return [job['filename'], labels_filename(job['filename'])]
+  return [job['filename']]
+
+def _shard_filename(filename, chunk_index):
+  return '%s.shard-%06d' % (filename, chunk_index)
+
+# Returns (shard_filename, contaminated), shard_filename being the shard file
+# to merge into the output file, or None if the rows were written straight
+# into the output file, and contaminated the find_contaminated_rows of the
+# chunk if validate, otherwise None
+def _write_chunk_rows(job, chunk_index, start, end, seed, validate):
+  with stage('generate'):
+    sample_arr, pos_index_arr, labels = generate_chunk(job, start, end, seed)
+  with stage('validate'):
+    contaminated = find_contaminated_rows(sample_arr, labels, start) if validate else None
+  if job['format'] == FORMAT_BIN:
+    with stage('write'):
+      write_binary_rows(job['filename'], start, sample_arr, pos_index_arr, labels)
+    return None, contaminated
+  if job['format'] == FORMAT_DIGITS:
+    with stage('write'):
+      write_digit_rows(job['filename'], start, sample_arr, labels)
+    return None, contaminated
+  if job['format'] == FORMAT_BCD:
+    with stage('write'):
+      write_bcd_rows(job['filename'], start, sample_arr, labels)
+    return None, contaminated
+  with stage('format'):
+    blocks = [sample_arr]
+    if job['with_pos']:
+      blocks.insert(0, PositionMask.from_pos_index_arr(pos_index_arr).words if job.get('pos_format') == POS_FORMAT_MASK else pos_index_arr)
+    data = format_csv_rows(blocks)
+  shard_filename = _shard_filename(job['filename'], chunk_index)
+  with stage('write'):
+    with open(shard_filename, mode='wb') as shard_file:
+      shard_file.write(data)
+  return shard_filename, contaminated
+
+# Returns (shard_filename, contaminated, stats), stats being the
+# Profiler.stats() of the chunk if profile_allocations is not None (see
+# run_jobs profile_filename), otherwise None
+def _write_chunk(task):
+  job, chunk_index, start, end, seed, validate, profile_allocations = task
+  if profile_allocations is None:
+    return _write_chunk_rows(job, chunk_index, start, end, seed, validate) + (None,)
+  with profiling(profile_allocations) as profiler:
+    result = _write_chunk_rows(job, chunk_index, start, end, seed, validate)
+  return result + (profiler.stats(),)
+
+def _tasks(jobs, seed, chunk_rows, validate, profile_allocations):
+  for job in jobs:
+    total_rows = job_rows(job)
+    job_chunk = chunk_rows or job_chunk_rows(job)
+    for chunk_index, start in enumerate(range(0, total_rows, job_chunk)):
+      yield (job, chunk_index, start, min(start + job_chunk, total_rows), seed, validate, profile_allocations)
+
+# Generate all the files described by jobs using workers processes
+# If seed is None, a random seed is picked (and printed) so the run can be repeated
+# chunk_rows: Rows in each chunk, job_chunk_rows if None
+# validate: Check the "none" rows of every chunk for a sequence as it is
+#           generated and report the contaminated rows (serial_hunter_validate.py)
+# cache_filename: If given, the files that are up to date in this cache file
+#                 are skipped, and the ones written are recorded in it (serial_hunter_cache.py)
+# force: Generate all the files even if they are up to date (and record them)
+# profile_filename: If given, the time (and with profile_allocations the peak
+#                   memory) of every stage of every file is written to it as
+#                   JSON, see serial_hunter_profile.py
+# Returns the seed used
+def run_jobs(jobs, workers=1, seed=None, chunk_rows=None, validate=False, cache_filename=None, force=False, profile_filename=None, profile_allocations=False):
+  if seed is None:
+    seed = np.random.SeedSequence().entropy
+  print("Seed: %d" % seed)
+  if cache_filename:
+    cache = load_cache(cache_filename)
+    keys = dict((job['filename'], job_key(job, seed)) for job in jobs)
+    up_to_date = [job for job in jobs if not force and is_up_to_date(cache, keys[job['filename']], job_filenames(job))]
+    for job in up_to_date:
+      print("Up to date: %s" % job['filename'])
+    jobs = [job for job in jobs if job not in up_to_date]
+    # Forget the files about to be written, so a run stopped halfway leaves none of them up to date
+    for job in jobs:
+      cache.pop(job['filename'], None)
+    save_cache(cache, cache_filename)
+  tasks = list(_tasks(jobs, seed, chunk_rows, validate, profile_allocations if profile_filename else None))
+  run_start = time.perf_counter()
+  profile_report = {}
+  for job in jobs:
+    if job['format'] == FORMAT_BIN:
+      create_binary_dataset(job['filename'], job_rows(job), job['single_sample_size'], job_label(job))
+    elif job['format'] == FORMAT_DIGITS:
+      create_digit_dataset(job['filename'], job_rows(job), job['single_sample_size'])
+    elif job['format'] == FORMAT_BCD:
+      create_bcd_dataset(job['filename'], job_rows(job), job['single_sample_size'])
+  pool = multiprocessing.Pool(workers) if workers > 1 else None
+  try:
+    results = pool.imap(_write_chunk, tasks) if pool else map(_write_chunk, tasks)
+    out_file = None
+    # Shards come back in task order, so merging is a plain append
+    for (job, chunk_index, start, end, _, _, _), (shard_filename, contaminated, stats) in zip(tasks, results):
+      if chunk_index == 0:
+        print("Create: %s" % job['filename'])
+        job_start = time.perf_counter()
+        profiler = Profiler() if profile_filename else None
+        out_file = CSVWriter(job['filename'], job.get('compression'), profiler=profiler) if shard_filename else None
+        contaminated_chunks = []
+      if profiler:
+        profiler.merge(stats)
+      if shard_filename:
+        with profiler.stage('merge') if profiler else NULL_STAGE:
+          with open(shard_filename, mode='rb') as shard_file:
+            out_file.write(shard_file.read())
+          os.remove(shard_filename)
+      if validate:
+        contaminated_chunks.append(contaminated)
+      if end == job_rows(job):
+        if out_file:
+          out_file.close()
+        if validate:
+          report(job['filename'], *(np.concatenate(arrs) for arrs in zip(*contaminated_chunks)))
+        if cache_filename:
+          record_files(cache, keys[job['filename']], job_filenames(job))
+          save_cache(cache, cache_filename)
+        if profiler:
+          profile_report[job['filename']] = {'rows': job_rows(job), 'chunks': chunk_index + 1, 'wall_seconds': time.perf_counter() - job_start, 'stages': profiler.stats()}
+  finally:
+    if pool:
+      pool.close()
+      pool.join()
+  if profile_filename:
+    with open(profile_filename, mode='w') as profile_file:
+      json.dump({'seed': seed, 'workers': workers, 'wall_seconds': time.perf_counter() - run_start, 'files': profile_report}, profile_file, indent=2, sort_keys=True)
+  return seed
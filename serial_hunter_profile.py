@@ -0,0 +1,170 @@
+# Opt-in instrumentation of the data file generation
+#
+# The generator is split into stages, and every stage records its calls, wall
+# time, CPU time (of its thread) and, with allocations, the peak memory
+# allocated above what was in use when it started (tracemalloc):
+# * generate: generate_chunk, within it
+#   * seq, non_seq, placement: the batch engine (serial_hunter_batch.py)
+#   * rng: the random bits of the draws (RowRNG)
+# * validate: find_contaminated_rows (--validate)
+# * format: The CSV text (format_csv_rows)
+# * write: Writing a chunk, the CSV shard, or the rows of a .bin / .npy / .bcd file
+# * merge: Appending the CSV shards to the output file (main process)
+# * compress, disk_write: In the background thread of CSVWriter
+# The times of a stage include the stages within it
+#
+#   with profiling() as profiler:
+#     with stage('generate'):
+#       ...
+#   profiler.stats()
+#
+# When no profiler is active stage() returns a shared no-op context, so the
+# instrumentation costs a function call per stage (a few per chunk), and
+# nothing is measured. run_jobs(profile_filename=...) profiles every chunk in
+# its worker and writes a JSON report per file, see serial_hunter_pool.py
+#
+# run_profiled hooks a whole run into cProfile or pyinstrument (if installed)
+# for a per-function view, in the calling process only, i.e., with --workers 1
+
+import contextlib
+import threading
+import time
+import tracemalloc
+
+PROFILER_CPROFILE = 'cprofile'
+PROFILER_PYINSTRUMENT = 'pyinstrument'
+PROFILERS = [PROFILER_CPROFILE, PROFILER_PYINSTRUMENT]
+
+# The context of the stages that are not measured
+NULL_STAGE = contextlib.nullcontext()
+_profiler = None
+
+class _Stage:
+  __slots__ = ('profiler', 'name', 'allocations', 'wall', 'cpu', 'frame')
+
+  def __init__(self, profiler, name, allocations):
+    self.profiler = profiler
+    self.name = name
+    self.allocations = allocations
+
+  def __enter__(self):
+    if self.allocations:
+      self.frame = self.profiler._enter_allocations()
+    self.cpu = time.thread_time()
+    self.wall = time.perf_counter()
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    wall = time.perf_counter() - self.wall
+    cpu = time.thread_time() - self.cpu
+    peak = self.profiler._exit_allocations(self.frame) if self.allocations else 0
+    self.profiler.add(self.name, 1, wall, cpu, peak)
+
+class Profiler:
+  # allocations: Also record the peak memory of every stage, tracemalloc
+  #              makes the run several times slower
+  def __init__(self, allocations=False):
+    self.allocations = allocations
+    # name: [calls, wall, cpu, peak_bytes, bytes]
+    self.stages = {}
+    self.lock = threading.Lock()
+    # [memory in use when the stage started, highest peak of the stages within it]
+    self._frames = []
+
+  # allocations: False for stages of other threads, tracemalloc peaks are process wide
+  def stage(self, name, allocations=True):
+    return _Stage(self, name, self.allocations and allocations)
+
+  def add(self, name, calls, wall, cpu, peak_bytes=0, nbytes=0):
+    with self.lock:
+      stats = self.stages.setdefault(name, [0, 0.0, 0.0, 0, 0])
+      stats[0] += calls
+      stats[1] += wall
+      stats[2] += cpu
+      stats[3] = max(stats[3], peak_bytes)
+      stats[4] += nbytes
+
+  # Count bytes produced by a stage, e.g., the CSV text
+  def count(self, name, nbytes):
+    self.add(name, 0, 0.0, 0.0, 0, nbytes)
+
+  def _enter_allocations(self):
+    frame = [tracemalloc.get_traced_memory()[0], 0]
+    self._frames.append(frame)
+    tracemalloc.reset_peak()
+    return frame
+
+  # The peak of a stage is the highest of the peak since it started (or since
+  # its last inner stage ended, which resets it) and the peaks of its inner stages
+  def _exit_allocations(self, frame):
+    peak = max(tracemalloc.get_traced_memory()[1], frame[1])
+    self._frames.pop()
+    if self._frames:
+      self._frames[-1][1] = max(self._frames[-1][1], peak)
+    tracemalloc.reset_peak()
+    return peak - frame[0]
+
+  # Add the stats() of another profiler, e.g., of a chunk generated by a worker
+  def merge(self, stats):
+    for name, stage_stats in stats.items():
+      self.add(name, stage_stats['calls'], stage_stats['wall_seconds'], stage_stats['cpu_seconds'], stage_stats['peak_bytes'], stage_stats['bytes'])
+
+  def stats(self):
+    with self.lock:
+      return dict((name, {'calls': calls, 'wall_seconds': wall, 'cpu_seconds': cpu, 'peak_bytes': peak, 'bytes': nbytes})
+                  for name, (calls, wall, cpu, peak, nbytes) in self.stages.items())
+
+def current_profiler():
+  return _profiler
+
+# Time a stage with the active profiler, if any
+def stage(name):
+  return NULL_STAGE if _profiler is None else _profiler.stage(name)
+
+def count(name, nbytes):
+  if _profiler is not None:
+    _profiler.count(name, nbytes)
+
+# Make a new Profiler the active one within the block (in this process)
+@contextlib.contextmanager
+def profiling(allocations=False):
+  global _profiler
+  previous = _profiler
+  profiler = Profiler(allocations)
+  started_tracing = allocations and not tracemalloc.is_tracing()
+  if started_tracing:
+    tracemalloc.start()
+  _profiler = profiler
+  try:
+    yield profiler
+  finally:
+    _profiler = previous
+    if started_tracing:
+      tracemalloc.stop()
+
+# Run function() under cProfile or pyinstrument and write what it reports
+# output_filename: cProfile stats (pstats / snakeviz) or pyinstrument's text report
+# Returns what function returns
+def run_profiled(function, profiler, output_filename):
+  if profiler == PROFILER_CPROFILE:
+    import cProfile
+    profile = cProfile.Profile()
+    try:
+      return profile.runcall(function)
+    finally:
+      profile.dump_stats(output_filename)
+  if profiler == PROFILER_PYINSTRUMENT:
+    # Imported here, pyinstrument is only needed for its report
+    try:
+      import pyinstrument
+    except ImportError:
+      raise ImportError("The pyinstrument package is needed for --profiler %s (pip install pyinstrument)" % PROFILER_PYINSTRUMENT)
+    profile = pyinstrument.Profiler()
+    profile.start()
+    try:
+      return function()
+    finally:
+      profile.stop()
+      with open(output_filename, mode='w') as output_file:
+        output_file.write(profile.output_text())
+  raise ValueError("profiler: %s must be one of %s" % (profiler, PROFILERS))
@@ -0,0 +1,127 @@
+# Counter-based random numbers, one independent stream per row
+#
+# A numpy Generator is sequential: to get the numbers of row i of a file, every
+# row before it (in its chunk) has to be generated again. Here every random
+# number is instead a hash (splitmix64) of
+#   (key, row, call, slot)
+# * key: From the seed and the stream (the data file name)
+# * row: The row of the file
+# * call: How many draws were made for these rows before this one
+# * slot: Position of the number within the row for this draw
+# so any row, or any set of rows, can be generated on its own in O(1) per row,
+# and gives the same numbers whatever chunk / shard / worker it is generated in
+#
+# RowRNG offers the numpy.random.Generator methods the batch engine uses,
+# integers(low, high, size, endpoint, dtype) and permuted(x, axis), with the
+# first axis of every draw being the row. row_random gives a random.Random for
+# the per-sample functions in serial_hunter_seq.py
+
+import hashlib
+import random
+
+import numpy as np
+
+from serial_hunter_profile import stage
+
+_GOLDEN_GAMMA = np.uint64(0x9e3779b97f4a7c15)
+_MIX_1 = np.uint64(0xbf58476d1ce4e5b9)
+_MIX_2 = np.uint64(0x94d049bb133111eb)
+
+# splitmix64 finalizer, element-wise on uint64 arrays (wraps around on overflow)
+def _mix(z):
+  with np.errstate(over='ignore'):
+    z = z ^ (z >> np.uint64(30))
+    z = z * _MIX_1
+    z = z ^ (z >> np.uint64(27))
+    z = z * _MIX_2
+    return z ^ (z >> np.uint64(31))
+
+# The stream name is hashed in full (sha256, as 8 32-bit words), so two names do not share a key
+def stream_key(seed, stream):
+  digest = hashlib.sha256(stream.encode()).digest()
+  spawn_key = tuple(int.from_bytes(digest[i:i + 4], 'little') for i in range(0, len(digest), 4))
+  return int(np.random.SeedSequence(seed, spawn_key=spawn_key).generate_state(1, np.uint64)[0])
+
+_LOW_32 = np.uint64(0xffffffff)
+_SHIFT_32 = np.uint64(32)
+# Spans up to here are drawn from 53 bits as a float, the larger ones with _multiply_high
+_FLOAT_SPAN = 2**53
+
+# High 64 bits of the 128-bit product of uint64 arrays a and b
+def _multiply_high(a, b):
+  a_high, a_low = a >> _SHIFT_32, a & _LOW_32
+  b_high, b_low = b >> _SHIFT_32, b & _LOW_32
+  low_high, high_low = a_low*b_high, a_high*b_low
+  mid = ((a_low*b_low) >> _SHIFT_32) + (low_high & _LOW_32) + (high_low & _LOW_32)
+  return a_high*b_high + (low_high >> _SHIFT_32) + (high_low >> _SHIFT_32) + (mid >> _SHIFT_32)
+
+# Exact offsets in [0, span) from the bits, with span up to 2**63 (Lemire's
+# multiply-high with rejection). A rejected number is drawn again from the
+# hash of its own bits, so the draws of the other numbers do not change
+def _exact_offsets(bits, span):
+  span = span.astype(np.uint64)
+  # 2**64 % span, the products whose low 64 bits are below it are rejected
+  threshold = (np.uint64(0) - span) % span
+  with np.errstate(over='ignore'):
+    rejected = np.ones(bits.shape, dtype=bool)
+    offsets = np.empty(bits.shape, dtype=np.uint64)
+    while np.any(rejected):
+      offsets[rejected] = _multiply_high(bits[rejected], span[rejected])
+      rejected[rejected] = bits[rejected]*span[rejected] < threshold[rejected]
+      bits[rejected] = _mix(bits[rejected] + _GOLDEN_GAMMA)
+  return offsets.astype(np.int64)
+
+class RowRNG:
+  # key: From stream_key
+  # rows: The rows (of the file) the draws are for, in the order of the first axis of the draws
+  def __init__(self, key, rows):
+    self.key = np.uint64(key)
+    self.rows = np.asarray(rows, dtype=np.uint64)
+    self.calls = 0
+    # Rows are hashed once, every draw only adds the call and slot
+    self.row_keys = _mix(self.key ^ _mix(self.rows + _GOLDEN_GAMMA))
+
+  # (len(rows),) + shape[1:] random uint64
+  def _bits(self, shape):
+    if len(shape) == 0 or shape[0] != len(self.rows):
+      raise ValueError("The draw shape: %s must have one row for each of the %d rows" % (shape, len(self.rows)))
+    with stage('rng'):
+      slots = np.arange(int(np.prod(shape[1:], dtype=np.int64)), dtype=np.uint64).reshape(shape[1:])
+      counter = (np.uint64(self.calls) << np.uint64(32)) | slots
+      self.calls += 1
+      row_keys = self.row_keys.reshape((-1,) + (1,)*(len(shape) - 1))
+      return _mix(row_keys + _mix(counter + _GOLDEN_GAMMA))
+
+  # Same as numpy.random.Generator.integers, low and high can be arrays
+  # The spans below 2**53 use 53 random bits as a float, the larger ones (up
+  # to 2**63 - 1) are exact, see _exact_offsets
+  def integers(self, low, high=None, size=None, dtype=np.int64, endpoint=False):
+    if high is None:
+      low, high = 0, low
+    low = np.asarray(low, dtype=np.int64)
+    high = np.asarray(high, dtype=np.int64) + (1 if endpoint else 0)
+    shape = np.broadcast_shapes(low.shape, high.shape, () if size is None else tuple(np.atleast_1d(size)))
+    span = high - low
+    if np.any(span <= 0):
+      raise ValueError("high must be greater than low")
+    bits = self._bits(shape)
+    span = np.broadcast_to(span, shape)
+    unit = (bits >> np.uint64(11)).astype(np.float64) * 2.0**-53
+    offset = np.minimum((unit*span).astype(np.int64), span - 1)
+    # Decided per number, so a row draws the same whatever rows it is drawn with
+    wide = span >= _FLOAT_SPAN
+    if np.any(wide):
+      offset[wide] = _exact_offsets(bits[wide], span[wide])
+    return (low + offset).astype(dtype)
+
+  # Same as numpy.random.Generator.permuted, each row shuffled on its own
+  def permuted(self, x, axis=None):
+    x = np.asarray(x)
+    if axis is None or x.ndim != 2 or axis not in (1, -1):
+      raise ValueError("RowRNG only shuffles within rows, i.e., 2-D arrays with axis=1")
+    order = np.argsort(self._bits(x.shape), axis=1)
+    return np.take_along_axis(x, order, axis=1)
+
+# random.Random for one row, e.g., to regenerate a single sample with serial_hunter_seq.py
+def row_random(seed, stream, row):
+  return random.Random(int(RowRNG(stream_key(seed, stream), [row]).row_keys[0]))
@@ -0,0 +1,254 @@
+# Sequence and sample generators, one sample (a list of numbers) per call
+#
+# These are the pure functions behind serial_hunter_data_gen.py, importing this
+# module only needs the standard library and has no side effects. See
+# serial_hunter_batch.py for the vectorized versions the data files are made with
+#
+# All randomness comes from the rng argument, a random.Random (e.g.,
+# serial_hunter_rng.row_random to regenerate one row of a file), or the random
+# module itself when rng is None
+
+import math
+import random
+
+from serial_hunter_config import NUMBER_SIZE, BATCH_NUMBER_COUNT, DATA_SIZE, THRESHOLD_GAP
+
+def _get_rng(rng):
+  return random if rng is None else rng
+
+# Finding the sequence of expected count and extending across the largest
+# distance for max_gap
+#
+# Example:
+# max_gap = 4
+# 1 + 4 = 5 (include), 1 2 3 4 5
+# 5 + 4 = 9 (include), 5 6 7 8 9
+# 9 + 4 = 13 (include), 9 10 11 12 13
+# 13 + 4 = 17 (include), 13 14 15 16 17
+#
+# seq_count = 2
+# First number: 1, Last number: 1 + ((2-1)*(4)) = 5, Distance = 5 - 1 = 4
+#
+# seq_count = 3
+# First number: 1, Last number: 1 + ((3-1)*(4)) = 9, Distance = 9 - 1 = 8
+#
+# seq_count = 4
+# First number: 1, Last number: 1 + ((4-1)*(4)) = 13, Distance = 13 - 1 = 12
+def find_largest_distance_between_first_and_last_in_seq(seq_count, max_gap=THRESHOLD_GAP):
+  return (seq_count-1)*max_gap
+
+# Get random first number in sequence
+# Takes into consideration min_number, max_number, and max_gap
+def get_seq_start(seq_count, min_number, max_number, max_gap=THRESHOLD_GAP, rng=None):
+  rng = _get_rng(rng)
+  latest_first_seq_elem = max_number - find_largest_distance_between_first_and_last_in_seq(seq_count, max_gap)
+  if latest_first_seq_elem < min_number:
+     raise ValueError("The distance min_number: %d and max_number: %d is not enough to support %d elements in sequence with max_gap: %d" % (min_number, max_number, seq_count, max_gap))
+  # The first number in the sequence cannot be later than latest_first_seq_elem
+  # This is important when latest_first_seq_elem < max_gap. Under this circumstances
+  # if first number in sequence is chosen by using random distance from min_number,
+  # it may choose a number that is greater than latest_first_seq_elem, and then if all
+  # other elements in sequence has max_gap in between, the later numbers will go beyond max_number
+  return rng.randint(min_number, latest_first_seq_elem)
+
+# Generate a sequence of numbers
+# seq_count: Elements in sequence
+# min_count: Min possible number in sequence
+# max_count: Max possible number in sequence
+# seq_pos: Where the sequence is in the position [NOT IMPLEMENTED]
+#          If 3 then the sequence is 3 positions from the right, i.e., 104233, 104333, 104433, etc.
+# min_gap: What is the min gap between elements in sequence, inclusive
+# max_gap: What is the max gap between elements in sequence, inclusive
+def generate_seq(seq_count, min_number, max_number, seq_pos=0, min_gap=1, max_gap=THRESHOLD_GAP, in_order=True, rng=None):
+  rng = _get_rng(rng)
+  seq_start = get_seq_start(seq_count, min_number, max_number, max_gap, rng)
+  seq_arr = [seq_start]
+  for i in range(seq_count-1):
+    seq_arr.append(seq_arr[i]+rng.randint(min_gap, max_gap))
+  if not in_order:
+    rng.shuffle(seq_arr)
+  return seq_arr
+
+# Converts [0, 3, 5] to 0b101001, i.e., bit i is set for every position i, any number of bits
+def position_arr_to_mask(position_arr):
+  mask = 0
+  for i in position_arr:
+    mask |= 1 << i
+  return mask
+
+# Converts [0, 3, 5] to 101001, i.e., each number specifies whic the '1' bit should be
+# with the bit order starting from right to left
+# position_arr: an array containing the positions of where all '1' bits are
+# total bit count: this determines hot many bits in total so we can pad the left or right with 0s
+#                  depending on least_significant_on_left
+# least_significant_on_left: Reverses the bits such bit order is left to right
+def convert_position_arr_to_binary(position_arr, total_bit_count, least_significant_on_left=True):
+  binary_encoded_positions = bin(position_arr_to_mask(position_arr))[2:]
+  padded_order_adjust_binary_encoded_positions = None
+  if least_significant_on_left:
+    # Reverse the binary encoded positions so that they are they are in the same order as 
+    order_adjust_binary_encoded_positions = binary_encoded_positions[::-1]
+    padded_order_adjust_binary_encoded_positions = order_adjust_binary_encoded_positions.ljust(total_bit_count, '0')
+  else:
+    order_adjust_binary_encoded_positions = binary_encoded_positions
+    padded_order_adjust_binary_encoded_positions = order_adjust_binary_encoded_positions.rjust(total_bit_count, '0')
+  return padded_order_adjust_binary_encoded_positions
+
+# Same like generate_seq but also returns position index
+def generate_seq_with_pos_index(seq_count, min_number, max_number, seq_pos=0, min_gap=1, max_gap=THRESHOLD_GAP, rng=None):
+  rng = _get_rng(rng)
+  if seq_pos == 0:
+    first_part = get_seq_start(seq_count, min_number, max_number, max_gap, rng)
+    second_part_str = ""
+  else:
+    # Remove the first seq_pos digits because we want the sequence to happen
+    # at seq_pos position from the right
+    seq_num = get_seq_start(seq_count, min_number, max_number, max_gap, rng)
+    if seq_pos >= NUMBER_SIZE:
+      raise ValueError("seq_pos: %d, which is the how far from the right the sequence patter happens MUST be less than NUMBER_SIZE: %d" % (seq_pos, NUMBER_SIZE))
+    seq_num_str = str(seq_num)
+    first_part_str = seq_num_str[0] + seq_num_str[seq_pos+1:]
+    first_part = int(first_part_str)
+    # Generate some random number to be appended to the truncated number. This part will be fixed
+    second_part_str = (("%0" + str(seq_pos) + "d") % rng.randint(0, 10**seq_pos-1))
+    if (len(first_part_str) + len(second_part_str)) != NUMBER_SIZE:
+      raise ValueError("seq_num: %d with seq_pos: %d does not make a number of NUMBER_SIZE: %d digits" % (seq_num, seq_pos, NUMBER_SIZE))
+  first_part_arr = [first_part]
+  for i in range(seq_count-1):
+    first_part_arr.append(first_part_arr[i]+rng.randint(min_gap, max_gap))
+  return list(map(lambda x: int(str(x) + second_part_str), first_part_arr))
+
+# Generate a set of numbers that are guaranteed to be non sequence
+# Divide them into blocks of max_gap numbers, avoid the blocks that contain the
+# sequence (and the ones next to them), and pick each number from its own
+# block with at least one block between any two picked blocks, so no two
+# numbers are within max_gap of each other or of the sequence
+# The blocks are picked without retries: sort the draws from the
+# available - 2*(count-1) allowed positions and add 2*i to the i-th one, then
+# skip over the sequence blocks. The numbers are returned shuffled
+def generate_non_seq_numbers(seq_arr, min_number, max_number, max_gap=THRESHOLD_GAP, single_sample_size=BATCH_NUMBER_COUNT, rng=None):
+  rng = _get_rng(rng)
+  count = single_sample_size - len(seq_arr)
+  if count <= 0:
+    return []
+  block_count = (max_number - min_number)//max_gap
+  # Blocks of seq that we should not pick numbers from
+  # Also avoid adjacent blocks
+  seq_arr_block_number_start = max((min(seq_arr) - min_number)//max_gap - 1, 0)
+  seq_arr_block_number_end = min((max(seq_arr) - min_number)//max_gap + 1, block_count - 1)
+  excluded = seq_arr_block_number_end - seq_arr_block_number_start + 1
+  positions = block_count - excluded - 2*(count - 1)
+  if positions <= 0:
+    raise ValueError("The distance min_number: %d (block number: %d) and max_number: %d (block number: %d) with sequence from: %d (block number: %d) to: %d (block number: %d) does not have enough number range to produce %d numbers not in the sequence" % (min_number, 0, max_number, block_count - 1, min(seq_arr), seq_arr_block_number_start, max(seq_arr), seq_arr_block_number_end, count))
+  non_seq_numbers = []
+  for i, block_number in enumerate(sorted(rng.randrange(positions) for _ in range(count))):
+    block_number += 2*i
+    if block_number >= seq_arr_block_number_start:
+      block_number += excluded
+    non_seq_numbers.append(min_number + block_number*max_gap + rng.randrange(max_gap))
+  rng.shuffle(non_seq_numbers)
+  return non_seq_numbers
+
+# Given a sequence, add other non-sequence numbers to create the entire sample,
+# which contains BATCH_NUMBER_COUNT numbers
+#ORIG def generate_seq_sparse(seq_arr, min_number, max_number, max_gap=THRESHOLD_GAP, single_sample_size=BATCH_NUMBER_COUNT):
+#ORIG   sample_arr = generate_non_seq_numbers(seq_arr, min_number, max_number, max_gap, single_sample_size)
+#ORIG   seq_idx_arr = []
+#ORIG   seq_elem_distance = math.floor(single_sample_size/len(seq_arr))
+#ORIG   for i in range(len(seq_arr)):
+#ORIG     seq_idx_arr.append(i*seq_elem_distance)
+#ORIG     sample_arr.insert(i*seq_elem_distance, seq_arr[i])
+#ORIG   return sample_arr
+
+# Put the sequence elements at the seq_idx_arr indexes (in increasing order) and
+# fill every other index, in order, with the non-sequence numbers
+# One pass over a preallocated list, instead of list.insert or re-slicing the
+# non-sequence numbers for every element, so it is linear in single_sample_size
+def _scatter_seq(seq_arr, seq_idx_arr, non_seq_numbers, single_sample_size):
+  sample_arr = [None]*single_sample_size
+  prev_idx = 0
+  filled = 0
+  for idx, number in zip(seq_idx_arr, seq_arr):
+    sample_arr[prev_idx:idx] = non_seq_numbers[filled:filled + idx - prev_idx]
+    filled += idx - prev_idx
+    sample_arr[idx] = number
+    prev_idx = idx + 1
+  sample_arr[prev_idx:] = non_seq_numbers[filled:]
+  return sample_arr
+
+# Same as generate_seq_sparse but also returns the seq index positions
+def generate_seq_sparse(seq_arr, min_number, max_number, max_gap=THRESHOLD_GAP, single_sample_size=BATCH_NUMBER_COUNT, include_pos_index_arr=False, rng=None):
+  non_seq_numbers = generate_non_seq_numbers(seq_arr, min_number, max_number, max_gap, single_sample_size, rng)
+  seq_elem_distance = math.floor(single_sample_size/len(seq_arr))
+  seq_idx_arr = [i*seq_elem_distance for i in range(len(seq_arr))]
+  sample_arr = _scatter_seq(seq_arr, seq_idx_arr, non_seq_numbers, single_sample_size)
+  if include_pos_index_arr:
+    bin_encoded_pos_arr = list(convert_position_arr_to_binary(seq_idx_arr, single_sample_size))
+    return [bin_encoded_pos_arr, sample_arr]
+  else:
+    return sample_arr
+
+def generate_seq_tail_heavy(seq_arr, min_number, max_number, max_gap=THRESHOLD_GAP, single_sample_size=BATCH_NUMBER_COUNT, include_pos_index_arr=False, rng=None):
+  #OLD new_arr = None
+  #OLD # Sequence numbers can start from this (including) this index
+  #OLD halfway_idx = math.floor(single_sample_size/2)
+  #OLD if (single_sample_size - halfway_idx) < len(seq_arr):
+  #OLD   # There are too many seq numbers to fit into the 2nd half of sample
+  #OLD   raise ValueError("Each half of the sample size should be (single_sample_size/2): %d, but len(seq_arr): %d, which is the number of sequential numbers that we want to squeeze into the tail end is greater than what half of the sample size can contain" % (halfway_idx))
+  #OLD else:
+  #OLD   sample_arr = generate_non_seq_numbers(seq_arr, min_number, max_number, max_gap, single_sample_size)
+  #OLD   new_arr = sample_arr[0:halfway_idx]
+  #OLD   to_use_no_seq_arr = sample_arr[halfway_idx:]
+  #OLD   remain_space_between_seq_in_tail = single_sample_size - halfway_idx - len(seq_arr)
+  #OLD   for i in seq_arr:
+  #OLD     curr_usable_idx = len(new_arr)
+  #OLD     # Randomly choose how far away from current elem the next number in the seq is
+  #OLD     space = random.randint(0, remain_space_between_seq_in_tail)
+  #OLD     new_arr += to_use_no_seq_arr[0:space]
+  #OLD     to_use_no_seq_arr = to_use_no_seq_arr[space:]
+  #OLD     new_arr.append(i)
+  #OLD return new_arr
+  return generate_seq_head_within_pct_position(seq_arr, min_number, max_number, 51, 100, max_gap, single_sample_size, include_pos_index_arr, rng)
+
+def generate_seq_head_heavy(seq_arr, min_number, max_number, max_gap=THRESHOLD_GAP, single_sample_size=DATA_SIZE, include_pos_index_arr=False, rng=None):
+  return generate_seq_head_within_pct_position(seq_arr, min_number, max_number, 0, 50, max_gap, single_sample_size, include_pos_index_arr, rng)
+
+def generate_seq_head_within_pct_position(seq_arr, min_number, max_number, start_pct, end_pct, max_gap=THRESHOLD_GAP, single_sample_size=DATA_SIZE, include_pos_index_arr=False, rng=None):
+  rng = _get_rng(rng)
+  new_arr = None
+  seq_idx_arr = []
+  # Sequence numbers can start from this (including) this index
+  start_idx = math.floor(start_pct*single_sample_size/100)
+  end_idx = math.ceil(end_pct*single_sample_size/100)
+  #pdb.set_trace()
+  if (end_idx - start_idx) < len(seq_arr):
+    # There are too many seq numbers to fit into the range
+    raise ValueError("The space available within start_idx: %d (start_pct: %d), end_idx: %d (end_pct: %d), but len(seq_arr): %d, which is the number of sequential numbers that we want to squeeze into space avaialble" % (start_idx, start_pct, end_idx, end_pct, len(seq_arr)))
+  else:
+    sample_arr = generate_non_seq_numbers(seq_arr, min_number, max_number, max_gap, single_sample_size, rng)
+    remain_space_between_seq = end_idx - start_idx - len(seq_arr)
+    prev_seq_idx = start_idx-1
+    for i in seq_arr:
+      # Randomly choose how far away from current elem the next number in the seq is
+      space = rng.randint(0, remain_space_between_seq)
+      prev_seq_idx += space + 1
+      seq_idx_arr.append(prev_seq_idx)
+      remain_space_between_seq -= space
+    new_arr = _scatter_seq(seq_arr, seq_idx_arr, sample_arr, single_sample_size)
+  if include_pos_index_arr:
+    bin_encoded_pos_arr = list(convert_position_arr_to_binary(seq_idx_arr, single_sample_size))
+    return [bin_encoded_pos_arr, new_arr]
+  else:
+    return new_arr
+
+# def generate_seq_start_focus(seq_arr):
+
+# def generate_seq_middle_focus(seq_arr):
+
+# def generate_seq_end_focus(seq_arr):
+
+# Goal: Generate the entire BATCH_NUMBER_COUNT * NUMBER_SIZE*8-bit (EBCDIC number) 
+# 
+def gen_data_type_1(seq_count, min_number, max_number=10**NUMBER_SIZE, min_gap=0, max_gap=THRESHOLD_GAP, rng=None):
+  seq_arr = generate_seq(seq_count, min_number, max_number, rng=rng)
+  return generate_seq_sparse(seq_arr, min_number, max_number, rng=rng)
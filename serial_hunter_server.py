@@ -0,0 +1,224 @@
+# Scoring server for the multi-class CNN
+#
+# Scoring one sample at a time costs about as much as scoring a batch of them,
+# so concurrent requests are coalesced: they wait in a queue until either
+# max_batch_size of them are there or the oldest has waited max_latency_ms, and
+# are then scored with a single predict (serial_hunter_model.py)
+#
+# HTTP (or HTTP over a Unix socket with --unix), JSON in and out:
+# * POST /score {"numbers": [<single_sample_size numbers>]}
+#   -> {"class": "sparse", "probabilities": {"none": 0.01, "sparse": 0.93, ...}}
+# * GET /metrics
+#   -> {"requests": ..., "batches": ..., "latency_ms": {"p50": ..., "p99": ...}, "batch_fill": ...}
+#   latency is from when the request is queued to when its result is ready, and
+#   batch_fill is the average batch size over max_batch_size
+
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import json
+import time
+
+import numpy as np
+
+from serial_hunter_config import NUMBER_SIZE
+from serial_hunter_model import CLASS_NAMES, MODEL_FILENAME, load_model
+
+MAX_BATCH_SIZE = 64
+MAX_LATENCY_MS = 5
+# How many of the latest latencies / batch sizes the metrics are computed from
+METRICS_WINDOW = 10000
+# Many clients connect at the same time, once a minute
+BACKLOG = 1024
+
+class MicroBatcher:
+  def __init__(self, model, max_batch_size=MAX_BATCH_SIZE, max_latency_ms=MAX_LATENCY_MS, number_size=NUMBER_SIZE):
+    self.model = model
+    self.max_batch_size = max_batch_size
+    self.max_latency = max_latency_ms / 1000.0
+    self.number_size = number_size
+    self.single_sample_size = model.input_shape[1] // number_size
+    self.queue = asyncio.Queue()
+    # One thread, so the next batch is collected while the current one is scored
+    self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    self.requests = 0
+    self.batches = 0
+    self.latencies = collections.deque(maxlen=METRICS_WINDOW)
+    self.batch_sizes = collections.deque(maxlen=METRICS_WINDOW)
+    self.task = None
+
+  def start(self):
+    self.task = asyncio.get_running_loop().create_task(self._run())
+
+  async def stop(self):
+    self.task.cancel()
+    try:
+      await self.task
+    except asyncio.CancelledError:
+      pass
+    self.executor.shutdown()
+
+  # numbers: One sample, single_sample_size numbers
+  # Returns (class name, {class name: probability})
+  async def score(self, numbers):
+    if len(numbers) != self.single_sample_size:
+      raise ValueError("numbers has %d numbers, the model takes %d" % (len(numbers), self.single_sample_size))
+    # Checked here, a bad request must not fail the whole batch
+    # JSON integers only, int() would take 1.7 as 1 and "17" as 17
+    not_int = [number for number in numbers if not isinstance(number, int) or isinstance(number, bool)]
+    if not_int:
+      raise ValueError("%d of the numbers are not integers, e.g., %s" % (len(not_int), json.dumps(not_int[0])))
+    out_of_range = [number for number in numbers if not 0 <= number < 10**self.number_size]
+    if out_of_range:
+      raise ValueError("%d of the numbers are not 0 to %d digits, e.g., %d" % (len(out_of_range), self.number_size, out_of_range[0]))
+    future = asyncio.get_running_loop().create_future()
+    await self.queue.put((time.perf_counter(), numbers, future))
+    return await future
+
+  async def _collect(self):
+    batch = [await self.queue.get()]
+    deadline = batch[0][0] + self.max_latency
+    while len(batch) < self.max_batch_size:
+      timeout = deadline - time.perf_counter()
+      if timeout <= 0:
+        break
+      try:
+        batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+      except asyncio.TimeoutError:
+        break
+    # Take whatever else is already waiting without waiting any longer
+    while len(batch) < self.max_batch_size and not self.queue.empty():
+      batch.append(self.queue.get_nowait())
+    return batch
+
+  async def _run(self):
+    loop = asyncio.get_running_loop()
+    while True:
+      batch = await self._collect()
+      # A batch that fails only fails its own requests, the loop keeps going
+      try:
+        sample_arr = np.array([numbers for _, numbers, _ in batch], dtype=np.int64)
+        probabilities = await loop.run_in_executor(self.executor, self.model.predict_samples, sample_arr, self.number_size)
+      except Exception as e:
+        for _, _, future in batch:
+          if not future.done():
+            future.set_exception(e)
+        continue
+      done = time.perf_counter()
+      self.requests += len(batch)
+      self.batches += 1
+      self.batch_sizes.append(len(batch))
+      for (queued, _, future), row in zip(batch, probabilities.tolist()):
+        self.latencies.append(done - queued)
+        if not future.done():
+          future.set_result((CLASS_NAMES[int(np.argmax(row))], dict(zip(CLASS_NAMES, row))))
+
+  def metrics(self):
+    latencies = np.array(self.latencies)*1000
+    return {
+      'requests': self.requests,
+      'batches': self.batches,
+      'latency_ms': {
+        'p50': float(np.percentile(latencies, 50)) if len(latencies) else None,
+        'p99': float(np.percentile(latencies, 99)) if len(latencies) else None,
+      },
+      'batch_fill': float(np.mean(self.batch_sizes)) / self.max_batch_size if self.batch_sizes else None,
+      'max_batch_size': self.max_batch_size,
+      'max_latency_ms': self.max_latency*1000,
+    }
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+def _response(status, body, keep_alive):
+  body = json.dumps(body).encode('utf8')
+  head = "HTTP/1.1 %d %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\nConnection: %s\r\n\r\n" % (status, STATUS_TEXT[status], len(body), 'keep-alive' if keep_alive else 'close')
+  return head.encode('latin1') + body
+
+async def _read_request(reader):
+  request_line = await reader.readline()
+  if not request_line:
+    return None
+  method, path, version = request_line.decode('latin1').split()
+  headers = {}
+  while True:
+    line = await reader.readline()
+    if line in (b'\r\n', b'\n', b''):
+      break
+    name, _, value = line.decode('latin1').partition(':')
+    headers[name.strip().lower()] = value.strip()
+  body = await reader.readexactly(int(headers.get('content-length', 0)))
+  keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+  return method, path, body, keep_alive
+
+async def _handle(batcher, method, path, body):
+  if path == '/metrics':
+    if method != 'GET':
+      return 405, {'error': "use GET"}
+    return 200, batcher.metrics()
+  if path == '/score':
+    if method != 'POST':
+      return 405, {'error': "use POST"}
+    try:
+      numbers = json.loads(body)['numbers']
+      class_name, probabilities = await batcher.score(numbers)
+    except (ValueError, KeyError, TypeError) as e:
+      return 400, {'error': str(e)}
+    except Exception as e:
+      # Still an answer, rather than a dropped connection
+      return 500, {'error': "%s: %s" % (type(e).__name__, e)}
+    return 200, {'class': class_name, 'probabilities': probabilities}
+  return 404, {'error': "%s not found" % path}
+
+def make_connection_handler(batcher):
+  async def handle_connection(reader, writer):
+    try:
+      while True:
+        try:
+          request = await _read_request(reader)
+        except (ValueError, asyncio.IncompleteReadError):
+          writer.write(_response(400, {'error': "malformed request"}, False))
+          break
+        if request is None:
+          break
+        method, path, body, keep_alive = request
+        status, response = await _handle(batcher, method, path, body)
+        writer.write(_response(status, response, keep_alive))
+        await writer.drain()
+        if not keep_alive:
+          break
+    except ConnectionError:
+      pass
+    finally:
+      writer.close()
+  return handle_connection
+
+# unix_path: If given, listen on this Unix socket instead of host:port
+async def serve(model, host='127.0.0.1', port=8000, unix_path=None, max_batch_size=MAX_BATCH_SIZE, max_latency_ms=MAX_LATENCY_MS):
+  batcher = MicroBatcher(model, max_batch_size, max_latency_ms)
+  batcher.start()
+  handler = make_connection_handler(batcher)
+  if unix_path:
+    server = await asyncio.start_unix_server(handler, path=unix_path, backlog=BACKLOG)
+  else:
+    server = await asyncio.start_server(handler, host, port, backlog=BACKLOG)
+  print("Listen: %s" % (unix_path or "%s:%d" % (host, port)))
+  try:
+    async with server:
+      await server.serve_forever()
+  finally:
+    await batcher.stop()
+
+def main():
+  parser = argparse.ArgumentParser()
+  parser.add_argument('--model', default=MODEL_FILENAME, help="Keras .h5 (with its .json) or .npz made by serial_hunter_model.export_npz")
+  parser.add_argument('--host', default='127.0.0.1')
+  parser.add_argument('--port', type=int, default=8000)
+  parser.add_argument('--unix', help="Listen on this Unix socket path instead of --host/--port")
+  parser.add_argument('--max_batch_size', type=int, default=MAX_BATCH_SIZE)
+  parser.add_argument('--max_latency_ms', type=float, default=MAX_LATENCY_MS)
+  args = parser.parse_args()
+  asyncio.run(serve(load_model(args.model), args.host, args.port, args.unix, args.max_batch_size, args.max_latency_ms))
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,116 @@
+# Streaming serial hunter
+#
+# Instead of pulling BATCH_NUMBER_COUNT numbers every minute and checking each
+# batch on its own (which misses sequences split across two batches), the
+# numbers are fed one at a time into a sliding window and an alert is raised as
+# soon as a number completes a chain of THRESHOLD_SEQUENCE numbers
+# (see serial_hunter_detector.py for what a chain is)
+#
+# The numbers in the window are indexed by block, value // max_gap, like the
+# blocks of generate_non_seq_numbers. The neighbour of a number within max_gap
+# can only be in the same or an adjacent block, and a block holds at most
+# max_gap distinct numbers, so adding, expiring and extending a chain by one
+# number are O(1)
+
+import collections
+import time
+
+from serial_hunter_config import BATCH_NUMBER_COUNT, THRESHOLD_GAP, THRESHOLD_SEQUENCE
+
+# timestamp: When the number that completed the sequence arrived
+# number: The number that completed the sequence
+# sequence: All the (distinct) numbers of the sequence in the window, sorted
+Alert = collections.namedtuple('Alert', ['timestamp', 'number', 'sequence'])
+
+class StreamingSerialHunter:
+  # window_count: Keep at most this many of the latest numbers, None for no limit
+  # window_seconds: Expire the numbers older than this, None for no limit
+  # on_alert: If given, called with every Alert
+  def __init__(self, max_gap=THRESHOLD_GAP, threshold_sequence=THRESHOLD_SEQUENCE, window_count=BATCH_NUMBER_COUNT, window_seconds=None, on_alert=None):
+    self.max_gap = max_gap
+    self.threshold_sequence = threshold_sequence
+    self.window_count = window_count
+    self.window_seconds = window_seconds
+    self.on_alert = on_alert
+    # block -> {number: times it is in the window}
+    self.blocks = {}
+    # (timestamp, number) in arrival order
+    self.window = collections.deque()
+
+  def __len__(self):
+    return len(self.window)
+
+  def __contains__(self, number):
+    return number in self.blocks.get(number // self.max_gap, ())
+
+  # The closest number in the window that is below (direction -1) or
+  # above (direction 1) number and within max_gap, or None
+  def _neighbour(self, number, direction):
+    block = number // self.max_gap
+    best = None
+    for candidate_block in (block, block + direction):
+      for candidate in self.blocks.get(candidate_block, ()):
+        if 0 < (candidate - number)*direction <= self.max_gap and (best is None or (candidate - best)*direction < 0):
+          best = candidate
+    return best
+
+  # The numbers chained to number in one direction, closest first, stopping after limit numbers
+  def _walk(self, number, direction, limit=None):
+    chain = []
+    neighbour = self._neighbour(number, direction)
+    while neighbour is not None and (limit is None or len(chain) < limit):
+      chain.append(neighbour)
+      neighbour = self._neighbour(neighbour, direction)
+    return chain
+
+  def _remove(self, number):
+    block = number // self.max_gap
+    counts = self.blocks[block]
+    counts[number] -= 1
+    if counts[number] == 0:
+      del counts[number]
+      if not counts:
+        del self.blocks[block]
+
+  # Drop the numbers that are out of the window as of now
+  def expire(self, now=None):
+    if self.window_seconds is not None:
+      now = time.monotonic() if now is None else now
+      while self.window and self.window[0][0] <= now - self.window_seconds:
+        self._remove(self.window.popleft()[1])
+    if self.window_count is not None:
+      while len(self.window) > self.window_count:
+        self._remove(self.window.popleft()[1])
+
+  # Add the next number of the feed
+  # timestamp: When it arrived, time.monotonic() if None
+  # Returns the Alert if this number completed a sequence, otherwise None
+  def add(self, number, timestamp=None):
+    timestamp = time.monotonic() if timestamp is None else timestamp
+    number = int(number)
+    self.window.append((timestamp, number))
+    counts = self.blocks.setdefault(number // self.max_gap, {})
+    counts[number] = counts.get(number, 0) + 1
+    # Expire first, the alerted sequence must be in the window
+    self.expire(timestamp)
+    alert = None
+    # A number that is already in the window does not change any chain
+    if self.blocks.get(number // self.max_gap, {}).get(number) == 1:
+      limit = self.threshold_sequence
+      below = self._walk(number, -1, limit)
+      above = self._walk(number, 1, limit)
+      # Were the numbers below and above already one chain without this number
+      joined = len(below) > 0 and len(above) > 0 and above[0] - below[0] <= self.max_gap
+      before = len(below) + len(above) if joined else max(len(below), len(above))
+      if before < self.threshold_sequence <= len(below) + 1 + len(above):
+        sequence = self._walk(number, -1)[::-1] + [number] + self._walk(number, 1)
+        alert = Alert(timestamp, number, sequence)
+        if self.on_alert:
+          self.on_alert(alert)
+    return alert
+
+  # Add several numbers, returns the list of Alerts
+  def add_many(self, numbers, timestamps=None):
+    timestamps = [None]*len(numbers) if timestamps is None else timestamps
+    alerts = [self.add(number, timestamp) for number, timestamp in zip(numbers, timestamps)]
+    return [alert for alert in alerts if alert is not None]
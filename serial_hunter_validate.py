@@ -0,0 +1,125 @@
+# Validator for the "no sequence" rows of the data files
+#
+# The non-sequence numbers are picked so that they cannot form a sequence (see
+# generate_non_seq_numbers), and this checks it: every row labelled "none" is
+# scanned for a chain of THRESHOLD_SEQUENCE numbers at any seq_pos (see
+# serial_hunter_detector.py) and the rows that have one are reported as
+# contaminated
+#
+# Works on matrices (e.g., inline after a chunk is generated, see run_jobs
+# validate) and on the data files:
+# * .csv (or .csv.gz / .csv.zst): The rows of a file in the manifest are labelled from its parts,
+#   other files need the class of all their rows (--class)
+#   The layout (position index columns, position mask words or none) is worked
+#   out from the columns and the sample size (from the manifest or
+#   --single_sample_size), a file that fits no layout or more than one raises
+#   instead of being guessed, --pos_format narrows it down
+# * .bin (serial_hunter_binary.py), .npy (serial_hunter_digits.py) and .bcd (serial_hunter_bcd.py) have their labels
+#
+# python serial_hunter_validate.py <data file>... [--class none] [--pos_format mask] [--single_sample_size 50]
+# exits with 1 if any row is contaminated
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from serial_hunter_bcd import decode_samples, open_bcd_dataset
+from serial_hunter_binary import CLASS_NAMES, open_binary_dataset
+from serial_hunter_config import NUMBER_SIZE, THRESHOLD_GAP, THRESHOLD_SEQUENCE
+from serial_hunter_csv import read_csv_samples, strip_compression_extension
+from serial_hunter_detector import find_seq_pos_batch
+from serial_hunter_digits import digits_to_numbers, open_digit_dataset
+from serial_hunter_mask import POS_FORMATS
+
+NONE_LABEL = CLASS_NAMES.index('none')
+
+# Show at most this many contaminated rows in the report
+REPORT_ROWS = 10
+
+# Scan the rows labelled "none" for a sequence
+# labels: Class index (in CLASSES) of each row, or None if all the rows are "none"
+# first_row: Row index of the first row of sample_arr, e.g., where a chunk starts in its file
+# Returns (contaminated rows, seq_pos of their sequence), both arrays
+def find_contaminated_rows(sample_arr, labels=None, first_row=0, max_gap=THRESHOLD_GAP, threshold_sequence=THRESHOLD_SEQUENCE, number_size=NUMBER_SIZE):
+  sample_arr = np.atleast_2d(np.asarray(sample_arr, dtype=np.int64))
+  rows = np.arange(len(sample_arr)) if labels is None else np.flatnonzero(np.asarray(labels) == NONE_LABEL)
+  seq_pos = find_seq_pos_batch(sample_arr[rows], max_gap=max_gap, threshold_sequence=threshold_sequence, number_size=number_size)
+  contaminated = seq_pos >= 0
+  return rows[contaminated] + first_row, seq_pos[contaminated]
+
+# Returns the job of the file in the manifest, or None
+def _manifest_job(filename):
+  # Imported here, the manifest is only needed for CSV files
+  from serial_hunter_manifest import load_manifest, output_to_job
+  manifest = load_manifest()
+  for output in manifest['outputs']:
+    if output['filename'] == strip_compression_extension(os.path.basename(filename)):
+      return output_to_job(output, manifest.get('defaults', {}))
+  return None
+
+def _manifest_labels(job):
+  # Imported here, the pool is only needed for CSV files
+  from serial_hunter_pool import job_rows, row_labels
+  return row_labels(job, np.arange(job_rows(job)))
+
+# Read the samples and labels of a data file
+# class_name: The class of all the rows, needed for CSV files that are not in the manifest
+# pos_format: How the position index of a CSV file is written, worked out from the columns if not given
+# single_sample_size: Numbers in each sample of a CSV file, taken from the manifest if not given
+# Returns (sample_arr, labels)
+def read_labelled_samples(filename, class_name=None, pos_format=None, single_sample_size=None):
+  extension = os.path.splitext(filename)[1]
+  if extension == '.bin':
+    _, sample_arr, _, labels = open_binary_dataset(filename)
+  elif extension == '.npy':
+    x, y = open_digit_dataset(filename)
+    sample_arr, labels = digits_to_numbers(x), np.asarray(y).argmax(axis=1)
+  elif extension == '.bcd':
+    packed, y = open_bcd_dataset(filename)
+    sample_arr, labels = decode_samples(packed), np.asarray(y).argmax(axis=1)
+  else:
+    job = _manifest_job(filename)
+    # Not the job's pos_format, --pos_format of data_gen can override it without renaming the file
+    _, sample_arr = read_csv_samples(filename, pos_format, single_sample_size or (job['single_sample_size'] if job else None))
+    labels = _manifest_labels(job) if job and not class_name else None
+    if class_name is None and labels is None:
+      raise ValueError("%s is not in the manifest, give the class of its rows" % filename)
+    if labels is not None and len(labels) != len(sample_arr):
+      raise ValueError("%s has %d rows, the manifest says %d" % (filename, len(sample_arr), len(labels)))
+  if class_name is not None:
+    labels = np.full(len(sample_arr), CLASS_NAMES.index(class_name), dtype=np.uint8)
+  return sample_arr, labels
+
+# Returns (contaminated rows, seq_pos of their sequence) of a data file
+def validate_file(filename, class_name=None, pos_format=None, single_sample_size=None):
+  sample_arr, labels = read_labelled_samples(filename, class_name, pos_format, single_sample_size)
+  return find_contaminated_rows(sample_arr, labels)
+
+def report(filename, contaminated_rows, seq_pos):
+  if len(contaminated_rows) == 0:
+    print("Clean: %s" % filename)
+  else:
+    shown = ", ".join("%d (seq_pos: %d)" % (row, pos) for row, pos in zip(contaminated_rows[:REPORT_ROWS].tolist(), seq_pos[:REPORT_ROWS].tolist()))
+    print("Contaminated: %s, %d rows: %s%s" % (filename, len(contaminated_rows), shown, ", ..." if len(contaminated_rows) > REPORT_ROWS else ""))
+
+def main(argv=None):
+  parser = argparse.ArgumentParser()
+  parser.add_argument("filenames", nargs="+", help="Data files (.csv, .csv.gz, .csv.zst, .bin, .npy or .bcd)")
+  parser.add_argument("--class", dest="class_name", choices=CLASS_NAMES, default=None,
+                      help="Class of all the rows, e.g., none for a no sequence CSV file that is not in the manifest")
+  parser.add_argument("--pos_format", choices=POS_FORMATS, default=None,
+                      help="How the position index of the CSV files is written, worked out from the columns if not given")
+  parser.add_argument("--single_sample_size", type=int, default=None,
+                      help="Numbers in each sample of the CSV files, taken from the manifest if not given")
+  args = parser.parse_args(argv)
+  contaminated = False
+  for filename in args.filenames:
+    rows, seq_pos = validate_file(filename, args.class_name, args.pos_format, args.single_sample_size)
+    report(filename, rows, seq_pos)
+    contaminated = contaminated or len(rows) > 0
+  return 1 if contaminated else 0
+
+if __name__ == "__main__":
+  sys.exit(main())